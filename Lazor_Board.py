@@ -13,19 +13,19 @@ This script defines the Lazor game board and manages the placement of blocks, la
 '''
 
 from Lazor_parse import load_files
+from Lazor_trace import Puzzle, CODES, IncrementalTrace, trace_cells
 
 
 class Laser:
-    """Class representing a laser with position and direction."""
-    
-   '''
+    '''
     Class representing a laser with position and direction.
     
     Parameters:
         position (tuple): Initial position of the laser (x, y).
         direction (tuple): Direction of the laser (vx, vy).
     '''
-    
+    __slots__ = ('x', 'y', 'vx', 'vy')
+
     def __init__(self, x, y, vx, vy):
         self.x = x  # x position
         self.y = y  # Y position
@@ -49,6 +49,9 @@ class Block:
         targets (list): List of target points that lasers must intersect.
     '''
 
+    __slots__ = ('position',)
+    symbol = None  # Block type letter used in .bff files
+
     def __init__(self, position):
         self.position = position
 
@@ -59,30 +62,45 @@ class Block:
 
 class ReflectBlock(Block):
     """Reflects the laser at a 90-degree angle."""
+    __slots__ = ()
+    symbol = 'A'
+
     def touch(self, laser):
         laser.vx, laser.vy = -laser.vx, -laser.vy
 
 
 class OpaqueBlock(Block):
     """Blocks the laser"""
+    __slots__ = ()
+    symbol = 'B'
+
     def touch(self, laser):
         laser.vx, laser.vy = 0, 0
 
 
 class RefractBlock(Block):
     """Splits the laser into two directions."""
+    __slots__ = ()
+    symbol = 'C'
+
     def touch(self, laser):
         # Creates a reflected laser
         reflected = Laser(laser.x, laser.y, -laser.vx, -laser.vy)
         return [laser, reflected]
 
 
+# Block type letters, in the order of Board.placed
+KINDS = ('A', 'B', 'C')
+
+
 class Point:
     '''
     Represents the Point: for Lazor game.
     Manages the game board grid, block placements, and laser behavior.
     '''
     """Class representing a target point"""
+    __slots__ = ('x', 'y', 'touch')
+
     def __init__(self, x, y):
         self.x = x
         self.y = y
@@ -120,11 +138,22 @@ class Board:
         points (list): List of tuples for target points.
     '''
         self.origin_grid = grid # The origin grid parsed from bff files
-        self.grid = expand_grid(grid)  # Expanded grid
         self.blocks = {}  # Dictionary of block positions
         self.blocks_tem = []  # List to store unplaced block objects
         self.lasers = lasers
         self.points = points
+        # Initial laser states, used by reset() to undo simulate()
+        self.laser_start = [(i.x, i.y, i.vx, i.vy) for i in lasers]
+        # Immutable view of the puzzle for Lazor_trace.trace
+        self.puzzle = Puzzle(grid, self.laser_start, [(i.x, i.y) for i in points], blocks)
+        # Laser trace kept up to date by place_block and remove_block, and
+        # its flat cell map with the placed blocks (see Lazor_trace.Puzzle)
+        self.tracer = IncrementalTrace(self.puzzle)
+        self.cells = self.tracer.cells
+        # Bitsets of the open cells holding A, B and C blocks (see Puzzle.open_bit)
+        self.placed = [0, 0, 0]
+        self.hit_mask = 0  # Targets hit in the last simulate(), as a bitmask
+        self.steps = []  # Steps taken by each beam in the last simulate()
 
         for types, num in blocks.items():
             for _ in range(num):
@@ -135,6 +164,14 @@ class Board:
                 elif types == 'C':
                     self.blocks_tem.append(RefractBlock((0, 0)))  # Initialize RefractBlock
 
+    @property
+    def grid(self):
+        """The expanded grid with the placed blocks, built on demand"""
+        grid = expand_grid(self.origin_grid)
+        for (x, y), block in self.blocks.items():
+            grid[y][x] = block
+        return grid
+
     def place_block(self, block, position):
         
         '''
@@ -151,28 +188,61 @@ class Board:
         
         block.position = (position[0] * 2, position[1] * 2)
         self.blocks[(position[0] * 2, position[1] * 2)] = block
-        self.grid[(position[0] * 2, position[1] * 2)[1]][(position[0] * 2, position[1] * 2)[0]] = block
+        index = self.puzzle.cell_index(*position)
+        self.tracer.set_cell(index, CODES[block.symbol])
+        self.placed[KINDS.index(block.symbol)] |= self.puzzle.open_bit.get(index, 0)
+
+    def remove_block(self, position):
+
+        '''
+    Method remove_block.
+    Undoes place_block, restoring the original grid cell.
+
+    Parameters:
+        position (tuple): Coordinates (x, y) the block was placed at.
+    Returns:
+        Block: The block that was removed.
+        '''
+        index = self.puzzle.cell_index(*position)
+        self.tracer.set_cell(index, self.puzzle.cells[index])
+        block = self.blocks.pop((position[0] * 2, position[1] * 2))
+        self.placed[KINDS.index(block.symbol)] &= ~self.puzzle.open_bit.get(index, 0)
+        return block
+
+    def state(self):
+        """Returns the placement as a hashable tuple of A, B and C bitsets"""
+        return tuple(self.placed)
+
+    def placement(self):
+        """Returns the placed blocks as a dict of grid cell (x, y) to block type"""
+        return {(x // 2, y // 2): block.symbol for (x, y), block in self.blocks.items()}
+
+    def reset(self):
+        """Resets the lasers and points to their state before simulate"""
+        # Drop refracted lasers and move the original ones back to their start
+        del self.lasers[len(self.laser_start):]
+        for laser, (x, y, vx, vy) in zip(self.lasers, self.laser_start):
+            laser.x, laser.y, laser.vx, laser.vy = x, y, vx, vy
+        for i in self.points:
+            i.touch = False
 
     def simulate(self):
-        """Simulates the laser movement"""
-        for i in self.lasers:
-            while self.in_bounds(i):
-                # Move the laser
-                i.move()
-                # Detect touches odd or even
-                if (i.x % 2 == 1) and (i.y % 2 == 1):
-                    # Odd coordinate
-                    block = self.blocks.get((i.x // 2, i.y // 2))
-                    if block:
-                        re = block.touch(i)
-                        if isinstance(re, list):
-                            # If the laser is refracted
-                            self.lasers.extend(re[1:])
-
-                # Check if the laser touches a point
-                for n in self.points:
-                    if (i.x, i.y) == (n.x, n.y):
-                        n.touch = True
+        '''
+    Method simulate.
+    Simulates the laser movement through the placed blocks and marks the
+    points touched. Stopped, looping and duplicate refracted beams end as
+    soon as they are detected, so this always terminates.
+
+    Returns:
+        Trace: The result of Lazor_trace.trace; its steps field (also kept
+        as self.steps) gives the number of steps each beam took.
+        '''
+        result = trace_cells(self.puzzle, self.cells)
+        for i in self.points:
+            i.touch = (i.x, i.y) in result.hits
+        self.steps = result.steps
+        self.hit_mask = result.mask
+        return result
 
     def in_bounds(self, laser):
         """Checks if the laser is in bounds"""
@@ -180,7 +250,7 @@ class Board:
 
     def check(self):
         """Checks if all points are touched"""
-        return all(i.touch for i in self.points)
+        return self.hit_mask == self.puzzle.target_mask
 
     def display(self):
         """Displays the expanded grid with symbols for easier visualization."""
@@ -0,0 +1,109 @@
+'''
+EN.640.635 Software Carpentry at JHU
+Lazer Group Project
+Group： Weiting Yu, Yilin Li
+
+Lazor Game Solver - Library Entry Point
+This script gives the solver one entry point, solve, that takes a .bff file
+or a parsed puzzle and runs the engine and options asked for: the DFS, the
+NumPy batch engine, the parallel DFS, the constraint propagation engine or
+the dispatcher's choice, the first solution or all of them, a time or node
+budget with checkpoints, and the solution cache. Importing it does no work
+and loads none of the engines; NumPy, multiprocessing and sqlite3 are only
+imported by the option that needs them, so short-lived worker processes
+start fast.
+
+    from Lazor_api import solve
+    placement = solve("mad_1.bff")
+
+
+'''
+
+from Lazor_parse import load_files
+from Lazor_solver_finalversion import setup, make_blocks, dfs_solve, iter_solutions, placement_of, SearchCancelled
+
+ENGINES = ("auto", "dfs", "batch", "parallel", "propagate")
+
+
+def solve(puzzle, engine="dfs", find_all=False, limit=None, workers=None, seconds=None, nodes=None,
+          cancel=None, checkpoint=None, cache=None):
+    '''
+    Method solve.
+    Solves a Lazor puzzle.
+
+    Parameters:
+        puzzle (str or dict): A .bff file, or a puzzle as returned by parse_bff.
+        engine (str): 'dfs' (dfs_solve), 'batch' (Lazor_vector, needs NumPy),
+            'parallel' (Lazor_parallel), 'propagate' (Lazor_propagate) or
+            'auto' (picked by Lazor_dispatch).
+        find_all (bool): Return every solution instead of the first.
+        limit (int): Return at most this many solutions (implies find_all).
+        workers (int): Processes for the parallel engine.
+        seconds (float): Wall-clock budget (dfs engine only).
+        nodes (int): Node budget (dfs engine only).
+        cancel (Event): Token that stops the search when set (dfs engine only).
+        checkpoint (str): File to resume a stopped search from and to save it
+            to (dfs engine only, see Lazor_checkpoint).
+        cache (str or SolutionCache): Solution cache to look in first and to
+            store a new first solution in, as a SolutionCache or its path.
+    Returns:
+        tuple or list: The first solution as (position, block type) pairs, or
+        None if there is none; with find_all or limit, a list of solutions.
+    Raises:
+        ValueError: If the engine is unknown, or a budget is given for
+            another engine than dfs.
+        SearchCancelled: If the budget ran out or cancel was set first.
+    '''
+    if engine not in ENGINES:
+        raise ValueError(f"unknown engine {engine!r}, expected one of {', '.join(ENGINES)}")
+    data = load_files([puzzle])[puzzle] if isinstance(puzzle, str) else puzzle
+    find_all = find_all or limit is not None
+    budgeted = seconds is not None or nodes is not None or cancel is not None or checkpoint is not None
+
+    if engine == "auto":
+        from Lazor_dispatch import estimate, choose_engine
+        engine = "dfs" if budgeted else choose_engine(estimate(data), workers)[0]
+    if budgeted and engine != "dfs":
+        raise ValueError("seconds, nodes, cancel and checkpoint need the dfs engine")
+
+    if cache is not None and not find_all:
+        from Lazor_cache import SolutionCache
+        store = SolutionCache(cache) if isinstance(cache, str) else cache
+        try:
+            placement = store.get(data)
+            if placement is None:
+                placement = solve(data, engine, workers=workers, seconds=seconds, nodes=nodes,
+                                  cancel=cancel, checkpoint=checkpoint)
+                if placement is not None:
+                    store.put(data, placement)
+            return placement
+        finally:
+            if store is not cache:
+                store.close()
+
+    if budgeted:
+        from Lazor_checkpoint import resumable_solve
+        status, solutions, _ = resumable_solve(data, checkpoint, seconds, nodes, cancel, find_all)
+        if status == "stopped":
+            raise SearchCancelled()
+        if find_all:
+            return solutions[:limit]
+        return solutions[0] if solutions else None
+
+    if engine == "batch":
+        from Lazor_vector import batch_solve
+        result = batch_solve(data, find_all=find_all)
+    elif engine == "parallel":
+        from Lazor_parallel import parallel_solve
+        result = parallel_solve(data, workers, find_all=find_all)
+    elif engine == "propagate":
+        from Lazor_propagate import propagate_solve
+        result = propagate_solve(data, find_all=find_all)
+    elif find_all:
+        return list(iter_solutions(data, limit))
+    else:
+        board = setup(data)
+        if dfs_solve(board, make_blocks(data["blocks"]), board.puzzle.open_cells()) is None:
+            return None
+        return placement_of(board.puzzle, board.state())
+    return result[:limit] if find_all else result
@@ -0,0 +1,116 @@
+'''
+EN.640.635 Software Carpentry at JHU
+Lazer Group Project
+Group： Weiting Yu, Yilin Li
+
+Lazor Game Solver - Batch Solver
+This script solves many .bff files without any prompt. Files, glob patterns and
+directories are given on the command line; the puzzles are solved on a pool of
+worker processes and one JSON line is written per puzzle as soon as it finishes.
+
+    python Lazor_batch.py Board/ --workers 4 --timeout 30 > results.jsonl
+
+
+'''
+
+from Lazor_parse import load_files, find_bff_files
+from Lazor_solver_finalversion import (setup, make_blocks, placement_of, search,
+                                       SearchStats, SearchCancelled, Deadline, TranspositionTable)
+from Lazor_cache import SolutionCache
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import argparse
+import json
+import os
+import sys
+import time
+
+
+def solve_file(file_name, timeout=None, cache_path=None):
+    '''
+    Method solve_file.
+    Solves one .bff file and summarises the outcome.
+
+    Parameters:
+        file_name (str): The .bff file to solve.
+        timeout (float): Optional number of seconds after which the search gives up.
+        cache_path (str): Optional SolutionCache database to look the puzzle up
+            in first and to store a new solution in.
+    Returns:
+        dict: The record written for the puzzle: file, status ('solved',
+        'no_solution', 'timeout' or 'error'), placement as [x, y, type]
+        lists (None unless solved), seconds, nodes expanded and whether the
+        solution came from the cache.
+    '''
+    stats = SearchStats()
+    start = time.perf_counter()
+    record = {"file": file_name, "status": "no_solution", "placement": None, "cached": False}
+    cache = None
+    try:
+        data = load_files([file_name])[file_name]
+        cache = SolutionCache(cache_path) if cache_path else None
+        placement = cache.get(data) if cache is not None else None
+        record["cached"] = placement is not None
+        if placement is None:
+            board = setup(data)
+            cancel = Deadline(timeout) if timeout else None
+            for state in search(board, make_blocks(data["blocks"]), board.puzzle.open_cells(),
+                                stats, cancel=cancel, table=TranspositionTable()):
+                placement = placement_of(board.puzzle, state)
+                if cache is not None:
+                    cache.put(data, placement)
+                break
+        if placement is not None:
+            record["status"] = "solved"
+            record["placement"] = [[x, y, kind] for (x, y), kind in placement]
+    except SearchCancelled:
+        record["status"] = "timeout"
+    except Exception as error:
+        record["status"] = "error"
+        record["error"] = f"{type(error).__name__}: {error}"
+    finally:
+        if cache is not None:
+            cache.close()
+    record["seconds"] = round(time.perf_counter() - start, 6)
+    record["nodes"] = stats.nodes
+    return record
+
+
+def solve_batch(file_names, workers=None, timeout=None, cache_path=None):
+    '''
+    Method solve_batch.
+    Solves .bff files on a process pool, yielding records in the order they finish.
+
+    Each search stops itself once its timeout has passed, so a hard puzzle
+    only holds on to one worker and the rest of the batch carries on.
+
+    Parameters:
+        file_names (list): The .bff files to solve.
+        workers (int): Maximum number of worker processes (defaults to the CPU count).
+        timeout (float): Optional number of seconds allowed per puzzle.
+        cache_path (str): Optional SolutionCache database shared by the workers.
+    Returns:
+        generator: The record of each puzzle, as returned by solve_file.
+    '''
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        futures = [executor.submit(solve_file, file_name, timeout, cache_path) for file_name in file_names]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solve Lazor puzzles and write one JSON line per puzzle.")
+    parser.add_argument("paths", nargs="+", help=".bff files, glob patterns or directories")
+    parser.add_argument("--workers", type=int, default=None, help="maximum number of worker processes")
+    parser.add_argument("--timeout", type=float, default=None, help="seconds allowed per puzzle")
+    parser.add_argument("--cache", default=None, help="sqlite solution cache to use")
+    parser.add_argument("--output", default=None, help="file to write the JSON lines to (default: stdout)")
+    args = parser.parse_args()
+
+    out = open(args.output, "w") if args.output else sys.stdout
+    try:
+        for record in solve_batch(find_bff_files(args.paths), args.workers, args.timeout, args.cache):
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
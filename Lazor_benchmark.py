@@ -0,0 +1,199 @@
+'''
+EN.640.635 Software Carpentry at JHU
+Lazer Group Project
+Group： Weiting Yu, Yilin Li
+
+Lazor Game Solver - Benchmark Suite
+This script solves every level of the Board/ corpus several times with
+dfs_solve and records, per level, the wall time, the nodes expanded, the
+number of incremental simulations, the laser steps traced and the peak memory.
+The results are written as JSON and compared against a stored baseline, with
+a relative tolerance per metric, so changes to Board and dfs_solve can be
+judged with numbers. The cold import time of a module, which every worker
+process pays, can be measured as well.
+
+    python Lazor_benchmark.py Board/ --repeats 5 --baseline benchmark_baseline.json
+
+
+'''
+
+from Lazor_parse import load_files, find_bff_files
+from Lazor_solver_finalversion import setup, make_blocks, dfs_solve, SearchStats
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+# Default relative tolerance per metric: a result may exceed the baseline by
+# this fraction before it counts as a regression. The search counts are
+# deterministic, so any increase is flagged.
+TOLERANCES = {"seconds": 0.5, "nodes": 0.0, "simulations": 0.0, "laser_steps": 0.0, "peak_kib": 0.25}
+# Differences below these absolute amounts are never flagged, so that timer
+# noise on levels solved in a millisecond is not taken for a regression
+FLOORS = {"seconds": 0.005, "peak_kib": 64}
+
+
+def _solve(data):
+    """Solves a puzzle once and returns (solved, stats, board)"""
+    board = setup(data)
+    stats = SearchStats()
+    solved = dfs_solve(board, make_blocks(data["blocks"]), board.puzzle.open_cells(), stats) is not None
+    return solved, stats, board
+
+
+def run_level(file_name, repeats=5):
+    '''
+    Method run_level.
+    Benchmarks one level.
+
+    Parameters:
+        file_name (str): The .bff file to solve.
+        repeats (int): Number of timed runs; the median is reported.
+    Returns:
+        dict: solved, seconds (median of the runs, board setup included),
+        seconds_min, nodes, simulations (cell changes retraced by the
+        board's IncrementalTrace), laser_steps (event states traced) and
+        peak_kib (peak memory allocated during one extra, untimed run).
+    '''
+    data = load_files([file_name])[file_name]
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        solved, stats, board = _solve(data)
+        times.append(time.perf_counter() - start)
+
+    # Memory is measured on its own run, since tracing allocations slows it down
+    tracemalloc.start()
+    _solve(data)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "solved": solved,
+        "seconds": statistics.median(times),
+        "seconds_min": min(times),
+        "nodes": stats.nodes,
+        "simulations": board.tracer.updates,
+        "laser_steps": board.tracer.traced,
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def run_suite(file_names, repeats=5):
+    '''
+    Method run_suite.
+    Benchmarks a list of levels.
+
+    Parameters:
+        file_names (list): The .bff files to solve.
+        repeats (int): Number of timed runs per level.
+    Returns:
+        dict: The environment, the settings and a "levels" dict mapping each
+        file to the result of run_level.
+    '''
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeats": repeats,
+        "levels": {file_name: run_level(file_name, repeats) for file_name in file_names},
+    }
+
+
+def measure_import(module="Lazor_api", repeats=5):
+    '''
+    Method measure_import.
+    Measures how long a fresh interpreter takes to import a module.
+
+    Parameters:
+        module (str): The module to import.
+        repeats (int): Number of interpreters started; the median is reported.
+    Returns:
+        float: Milliseconds spent importing the module and everything it
+        imports, as reported by python -X importtime.
+    '''
+    times = []
+    for _ in range(repeats):
+        run = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                             capture_output=True, text=True, check=True)
+        # Lines read "import time: self | cumulative | name", the module last
+        for line in run.stderr.splitlines():
+            fields = [field.strip() for field in line.split("|")]
+            if len(fields) == 3 and fields[2] == module:
+                times.append(int(fields[1]) / 1000)
+    return statistics.median(times)
+
+
+def compare(results, baseline, tolerances=None):
+    '''
+    Method compare.
+    Compares benchmark results against a baseline.
+
+    Parameters:
+        results (dict): Output of run_suite.
+        baseline (dict): Output of an earlier run_suite.
+        tolerances (dict): Relative tolerance per metric; TOLERANCES is used
+            for the metrics not given.
+    Returns:
+        list: One message per regression: a level no longer solved, or a
+        metric above its baseline by more than the tolerance (and FLOORS).
+    '''
+    tolerances = dict(TOLERANCES, **(tolerances or {}))
+    regressions = []
+    for file_name, old in baseline["levels"].items():
+        new = results["levels"].get(file_name)
+        if new is None:
+            continue
+        if old["solved"] and not new["solved"]:
+            regressions.append(f"{file_name}: no longer solved")
+        for metric, tolerance in tolerances.items():
+            if metric not in old or metric not in new:
+                continue
+            limit = max(old[metric] * (1 + tolerance), old[metric] + FLOORS.get(metric, 0))
+            if new[metric] > limit:
+                regressions.append(f"{file_name}: {metric} {new[metric]:g} > {old[metric]:g} "
+                                   f"(+{tolerance:.0%} allowed)")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark dfs_solve over a set of Lazor levels.")
+    parser.add_argument("paths", nargs="*", default=["Board"], help=".bff files, glob patterns or directories")
+    parser.add_argument("--repeats", type=int, default=5, help="timed runs per level")
+    parser.add_argument("--output", default=None, help="file to write the results to as JSON")
+    parser.add_argument("--baseline", default=None, help="results of an earlier run to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="write the results to --baseline instead")
+    parser.add_argument("--tolerance", action="append", default=[], metavar="METRIC=FRACTION",
+                        help="relative tolerance of a metric, e.g. seconds=0.3")
+    parser.add_argument("--import-time", default=None, metavar="MODULE",
+                        help="only measure the cold import time of MODULE")
+    args = parser.parse_args()
+
+    if args.import_time:
+        print(f"import {args.import_time}: {measure_import(args.import_time, args.repeats):.2f} ms")
+        sys.exit(0)
+
+    results = run_suite(find_bff_files(args.paths), args.repeats)
+    for file_name, r in results["levels"].items():
+        print(f"{file_name:28} {'solved' if r['solved'] else 'unsolved':9} {r['seconds'] * 1000:9.2f} ms "
+              f"{r['nodes']:8} nodes {r['simulations']:8} sims {r['laser_steps']:9} steps {r['peak_kib']:9.1f} KiB")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline and args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+    elif args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        tolerances = {metric: float(value) for metric, value in (t.split("=") for t in args.tolerance)}
+        regressions = compare(results, baseline, tolerances)
+        for message in regressions:
+            print("REGRESSION", message)
+        print(f"{len(regressions)} regressions against {args.baseline}")
+        sys.exit(1 if regressions else 0)
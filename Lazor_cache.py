@@ -0,0 +1,153 @@
+'''
+EN.640.635 Software Carpentry at JHU
+Lazer Group Project
+Group： Weiting Yu, Yilin Li
+
+Lazor Game Solver - Solution Cache
+This script keeps solved placements in a local sqlite database, keyed by a
+fingerprint of the parsed puzzle, so a level is only searched once across runs.
+Every cached placement is traced again before it is returned, so an entry
+that no longer fits its puzzle is dropped instead of being trusted.
+
+
+'''
+
+from Lazor_solver_finalversion import setup, make_blocks, dfs_solve, placement_of
+from Lazor_trace import Puzzle, check_placement
+import hashlib
+import json
+import os
+import sqlite3
+
+# Where the cache lives unless a path is given
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "lazor", "solutions.sqlite")
+
+
+def fingerprint(data):
+    '''
+    Method fingerprint.
+    Hashes a parsed puzzle into a key that does not depend on how the file was
+    written: the order of lasers and points, repeated points and block types
+    with a count of zero make no difference.
+
+    Parameters:
+        data (dict): Parsed puzzle, as returned by parse_bff.
+    Returns:
+        str: Hex SHA-256 digest of the canonical form of the puzzle.
+    '''
+    canonical = {
+        "grid": [[str(n).strip() for n in row] for row in data["grid"]],
+        "blocks": sorted((k, n) for k, n in data["blocks"].items() if n),
+        "lasers": sorted(tuple(i) for i in data["lasers"]),
+        "points": sorted(set(tuple(i) for i in data["points"])),
+    }
+    text = json.dumps(canonical, separators=(",", ":"))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class SolutionCache:
+    '''
+    On-disk store of solved placements with least recently used eviction.
+
+    Parameters:
+        path (str): The sqlite database file, created if missing.
+        max_entries (int): Number of puzzles kept; the least recently used
+            ones are evicted beyond that.
+    Attributes:
+        hits (int): Lookups answered from the cache.
+        misses (int): Lookups not found in the cache.
+        stale (int): Entries found but dropped because they did not solve
+            their puzzle (also counted as misses).
+    '''
+
+    def __init__(self, path=DEFAULT_PATH, max_entries=10000):
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.db = sqlite3.connect(path)
+        self.db.execute("CREATE TABLE IF NOT EXISTS solutions "
+                        "(key TEXT PRIMARY KEY, placement TEXT NOT NULL, used INTEGER NOT NULL)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS solutions_used ON solutions (used)")
+        self.db.commit()
+
+    def _tick(self):
+        """Returns a use counter larger than that of every entry"""
+        return self.db.execute("SELECT COALESCE(MAX(used), 0) + 1 FROM solutions").fetchone()[0]
+
+    def get(self, data):
+        '''
+        Method get.
+        Looks a puzzle up, tracing the cached placement before returning it.
+
+        Parameters:
+            data (dict): Parsed puzzle, as returned by parse_bff.
+        Returns:
+            tuple: The cached solution as (position, block type) pairs, or None.
+        '''
+        key = fingerprint(data)
+        row = self.db.execute("SELECT placement FROM solutions WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        placement = tuple(((x, y), kind) for x, y, kind in json.loads(row[0]))
+        if not check_placement(Puzzle.from_data(data), dict(placement)):
+            self.stale += 1
+            self.misses += 1
+            self.db.execute("DELETE FROM solutions WHERE key = ?", (key,))
+            self.db.commit()
+            return None
+        self.hits += 1
+        self.db.execute("UPDATE solutions SET used = ? WHERE key = ?", (self._tick(), key))
+        self.db.commit()
+        return placement
+
+    def put(self, data, placement):
+        '''
+        Method put.
+        Stores the solution of a puzzle, evicting the least recently used
+        entries beyond max_entries.
+
+        Parameters:
+            data (dict): Parsed puzzle, as returned by parse_bff.
+            placement (tuple): The solution as (position, block type) pairs.
+        '''
+        text = json.dumps([[x, y, kind] for (x, y), kind in placement])
+        self.db.execute("INSERT OR REPLACE INTO solutions (key, placement, used) VALUES (?, ?, ?)",
+                        (fingerprint(data), text, self._tick()))
+        self.db.execute("DELETE FROM solutions WHERE key NOT IN "
+                        "(SELECT key FROM solutions ORDER BY used DESC LIMIT ?)", (self.max_entries,))
+        self.db.commit()
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+
+    def close(self):
+        """Closes the database"""
+        self.db.close()
+
+
+def cached_solve(data, cache, stats=None):
+    '''
+    Method cached_solve.
+    Solves a puzzle with dfs_solve unless the cache already holds its solution.
+
+    Parameters:
+        data (dict): Parsed puzzle, as returned by parse_bff.
+        cache (SolutionCache): The cache to look in and to store new solutions in.
+        stats (SearchStats): Optional counters, only updated when a search runs.
+    Returns:
+        tuple: The solution as (position, block type) pairs, or None if the
+        puzzle has no solution (which is not cached).
+    '''
+    placement = cache.get(data)
+    if placement is not None:
+        return placement
+    board = setup(data)
+    if dfs_solve(board, make_blocks(data["blocks"]), board.puzzle.open_cells(), stats) is None:
+        return None
+    placement = placement_of(board.puzzle, board.state())
+    cache.put(data, placement)
+    return placement
@@ -0,0 +1,206 @@
+'''
+EN.640.635 Software Carpentry at JHU
+Lazer Group Project
+Group： Weiting Yu, Yilin Li
+
+Lazor Game Solver - Budgeted and Resumable Solving
+This script runs the DFS solver under a wall-clock or node budget and a
+cancel token. When it is stopped, the search frontier (the subtrees not
+searched yet, see SearchCancelled.frontier) is written with the counters and
+the solutions found so far to a small JSON checkpoint file. Running again
+with the same checkpoint resumes exactly where the search stopped, so a long
+solve survives being preempted.
+
+    python Lazor_checkpoint.py mad_7.bff --checkpoint mad_7.ckpt --seconds 60
+
+
+'''
+
+from Lazor_parse import load_files
+from Lazor_solver_finalversion import (setup, make_blocks, place_state, placement_of, search, Subproblem,
+                                       SearchStats, SearchCancelled, TranspositionTable, BLOCK_ORDER)
+from Lazor_cache import fingerprint
+import argparse
+import json
+import os
+import signal
+import threading
+import time
+
+# Version of the checkpoint format, stored in every file
+VERSION = 1
+
+
+class Budget:
+    '''
+    A cancel event for search that sets itself once a wall-clock or node
+    budget is used up, or once a cancel token is set. The search checks it
+    every 64 nodes, so a node budget can be overrun by up to 63 nodes.
+
+    Attributes:
+        stats (SearchStats): The counters of the search being budgeted.
+        expires (float): time.monotonic() value at which the event is set, or None.
+        max_nodes (int): Value of stats.nodes at which the event is set, or None.
+        token (Event): Optional event that stops the search when set.
+    '''
+
+    def __init__(self, stats, seconds=None, nodes=None, token=None):
+        self.stats = stats
+        self.expires = None if seconds is None else time.monotonic() + seconds
+        self.max_nodes = None if nodes is None else stats.nodes + nodes
+        self.token = token
+
+    def is_set(self):
+        """Checks if the budget is used up or the token is set"""
+        return ((self.token is not None and self.token.is_set())
+                or (self.max_nodes is not None and self.stats.nodes >= self.max_nodes)
+                or (self.expires is not None and time.monotonic() >= self.expires))
+
+
+def save_checkpoint(path, data, frontier, stats, solutions, find_all):
+    '''
+    Method save_checkpoint.
+    Writes the state of a stopped search to a JSON file. The file is
+    replaced in one step, so an interrupted write leaves the old one intact.
+
+    Parameters:
+        path (str): The checkpoint file.
+        data (dict): Parsed puzzle, as returned by parse_bff.
+        frontier (list): Subproblem records still to search, in order.
+        stats (SearchStats): The counters so far.
+        solutions (list): The placements found so far.
+        find_all (bool): Whether the search collects every solution.
+    '''
+    checkpoint = {
+        "version": VERSION,
+        "puzzle": fingerprint(data),
+        "find_all": find_all,
+        "frontier": [[list(s.state), list(s.excluded), s.started] for s in frontier],
+        "stats": vars(stats),
+        "solutions": [[[x, y, kind] for (x, y), kind in p] for p in solutions],
+    }
+    with open(path + ".tmp", "w") as f:
+        json.dump(checkpoint, f, separators=(",", ":"))
+    os.replace(path + ".tmp", path)
+
+
+def load_checkpoint(path, data):
+    '''
+    Method load_checkpoint.
+    Reads a checkpoint written by save_checkpoint.
+
+    Parameters:
+        path (str): The checkpoint file.
+        data (dict): Parsed puzzle the checkpoint must belong to.
+    Returns:
+        tuple: The frontier (a list of Subproblem), the counters (SearchStats),
+        the solutions found so far and the find_all flag.
+    Raises:
+        ValueError: If the file is of another version or another puzzle.
+    '''
+    with open(path) as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("version") != VERSION:
+        raise ValueError(f"{path}: unsupported checkpoint version {checkpoint.get('version')}")
+    if checkpoint["puzzle"] != fingerprint(data):
+        raise ValueError(f"{path}: checkpoint belongs to another puzzle")
+    frontier = [Subproblem(tuple(state), tuple(excluded), started)
+                for state, excluded, started in checkpoint["frontier"]]
+    stats = SearchStats()
+    stats.add(checkpoint["stats"])
+    solutions = [tuple(((x, y), kind) for x, y, kind in p) for p in checkpoint["solutions"]]
+    return frontier, stats, solutions, checkpoint["find_all"]
+
+
+def resumable_solve(data, checkpoint=None, seconds=None, nodes=None, cancel=None, find_all=False):
+    '''
+    Method resumable_solve.
+    Solves a puzzle within a budget, resuming from a checkpoint if one exists.
+
+    The search runs over a frontier of Subproblem records, at first just the
+    root. When the budget runs out or cancel is set, the search takes its
+    blocks off the board and reports the subtrees it has left; those and the
+    frontier not reached yet are saved to the checkpoint. Together the
+    resumed runs find the same solutions as an uninterrupted search. With
+    find_all they also visit exactly its nodes, with the same counters. In
+    first-solution mode a transposition table is used, as in dfs_solve; it
+    starts empty on each run, so it skips fewer subtrees and the node counts
+    can be higher than those of an uninterrupted search.
+
+    Parameters:
+        data (dict): Parsed puzzle, as returned by parse_bff.
+        checkpoint (str): File to resume from if it exists, and to save to when stopped.
+        seconds (float): Wall-clock budget of this run.
+        nodes (int): Node budget of this run.
+        cancel (Event): Token that stops the search when set.
+        find_all (bool): Whether to collect every solution or stop at the first.
+            A checkpoint keeps the mode it was saved with.
+    Returns:
+        tuple: The status ('solved' when the first solution is found, 'done'
+        when the whole tree was searched, 'stopped' when the budget ran out
+        or cancel was set), the solutions as (position, block type) tuples
+        and the SearchStats of all runs so far.
+    '''
+    stats = SearchStats()
+    frontier = [Subproblem((0, 0, 0), (0, 0, 0))]
+    solutions = []
+    if checkpoint and os.path.exists(checkpoint):
+        frontier, stats, solutions, find_all = load_checkpoint(checkpoint, data)
+    if solutions and not find_all:
+        return "solved", solutions, stats
+
+    board = setup(data)
+    puzzle = board.puzzle
+    positions = puzzle.open_cells()
+    blocks = make_blocks(data["blocks"])
+    pool = [[block for block in blocks if type(block) is t] for t in BLOCK_ORDER]
+    table = None if find_all else TranspositionTable()
+    budget = Budget(stats, seconds, nodes, cancel)
+    while frontier:
+        subproblem = frontier[0]
+        place_state(board, pool, subproblem.state)
+        try:
+            for state in search(board, [b for group in pool for b in group], positions, stats,
+                                subproblem.excluded, cancel=budget, table=table, started=subproblem.started):
+                solutions.append(placement_of(puzzle, state))
+                if not find_all:
+                    break
+        except SearchCancelled as stop:
+            frontier[:1] = stop.frontier
+            if checkpoint:
+                save_checkpoint(checkpoint, data, frontier, stats, solutions, find_all)
+            return "stopped", solutions, stats
+        if solutions and not find_all:
+            break
+        # Leave the board empty for the next subproblem
+        for position in list(board.placement()):
+            block = board.remove_block(position)
+            pool[BLOCK_ORDER.index(type(block))].append(block)
+        frontier.pop(0)
+
+    if checkpoint and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    return ("solved" if solutions and not find_all else "done"), solutions, stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solve a Lazor puzzle within a budget, with checkpoints.")
+    parser.add_argument("file", help=".bff file to solve")
+    parser.add_argument("--checkpoint", default=None, help="file to resume from and to save to when stopped")
+    parser.add_argument("--seconds", type=float, default=None, help="wall-clock budget")
+    parser.add_argument("--nodes", type=int, default=None, help="node budget")
+    parser.add_argument("--all", action="store_true", help="collect every solution")
+    args = parser.parse_args()
+
+    # SIGTERM (a preempted batch job) and Ctrl-C stop the search and save the checkpoint
+    token = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: token.set())
+    signal.signal(signal.SIGINT, lambda *_: token.set())
+
+    data = load_files([args.file])[args.file]
+    status, solutions, stats = resumable_solve(data, args.checkpoint, args.seconds, args.nodes, token, args.all)
+    print(f"{status}: {len(solutions)} solutions, {stats.nodes} nodes")
+    for placement in solutions:
+        print(" ".join(f"{kind}@{x},{y}" for (x, y), kind in placement))
+    if status == "stopped" and args.checkpoint:
+        print(f"Checkpoint saved to {args.checkpoint}")
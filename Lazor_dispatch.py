@@ -0,0 +1,193 @@
+'''
+EN.640.635 Software Carpentry at JHU
+Lazer Group Project
+Group： Weiting Yu, Yilin Li
+
+Lazor Game Solver - Estimator and Dispatcher
+This script sizes up a puzzle before solving it: the exact number of block
+placements, a sampled estimate of the size of the pruned DFS tree and the
+average length of a trace. From those numbers the dispatcher picks the engine
+to run, brute-force batch evaluation, the pruned DFS or the parallel DFS, and
+logs its choice.
+
+    python Lazor_dispatch.py Board/ --estimate-only
+
+
+'''
+
+from Lazor_parse import load_files, find_bff_files
+from Lazor_solver_finalversion import (setup, make_blocks, dfs_solve, placement_of, count_placements,
+                                       SearchStats, BLOCK_ORDER)
+from Lazor_trace import trace
+from collections import namedtuple
+import argparse
+import importlib.util
+import logging
+import os
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+# Rough cost in seconds of one DFS node and of one placement scored by
+# Lazor_vector.evaluate, measured on the bundled levels
+NODE_SECONDS = 3e-5
+PLACEMENT_SECONDS = 7e-6
+# Predicted DFS time above which the process pool pays for its start-up
+PARALLEL_SECONDS = 2.0
+
+# placements: exact number of distinct placements over the open cells;
+# tree_nodes: estimated number of nodes of the pruned DFS tree;
+# trace_length: average number of points the beams pass per placement
+Estimate = namedtuple("Estimate", ["placements", "tree_nodes", "trace_length"])
+
+
+def _probe(board, pool, position_of, available, rng):
+    """Walks one random path down the pruned DFS tree and returns Knuth's estimate of its size"""
+    tracer = board.tracer
+    excluded = [0, 0, 0]
+    placed = []
+    weight = total = 1
+    while any(pool) and not tracer.solved():
+        a, b, c = board.placed
+        live = available & ~(a | b | c) & tracer.touched_mask
+        choices = [(bit, g) for bit in position_of if live & bit
+                   for g in range(3) if pool[g] and not excluded[g] & bit]
+        if not choices:
+            break
+        k = rng.randrange(len(choices))
+        # The children before the one taken are excluded below it, as in the DFS
+        for bit, g in choices[:k]:
+            excluded[g] |= bit
+        weight *= len(choices)
+        total += weight
+        bit, g = choices[k]
+        board.place_block(pool[g].pop(), position_of[bit])
+        placed.append((position_of[bit], g))
+    for position, g in reversed(placed):
+        pool[g].append(board.remove_block(position))
+    return total
+
+
+def estimate(data, samples=64, seed=0):
+    '''
+    Method estimate.
+    Sizes up the search for a puzzle.
+
+    The tree size is the mean of Knuth's estimator over random root-to-leaf
+    walks of the pruned DFS tree (the product of the branching factors met
+    on the way), ignoring sealed branches and the transposition table, so it
+    leans high. The trace length is averaged over random placements.
+
+    Parameters:
+        data (dict): Parsed puzzle, as returned by parse_bff.
+        samples (int): Number of random walks and random placements.
+        seed (int): Seed of the random generator, for repeatable estimates.
+    Returns:
+        Estimate: The placement count, estimated tree size and trace length.
+    '''
+    rng = random.Random(seed)
+    blocks = {k: n for k, n in data["blocks"].items() if n}
+    board = setup(data)
+    puzzle = board.puzzle
+    cells = puzzle.open_cells()
+    placements = count_placements(len(cells), blocks)
+
+    blocks_list = make_blocks(blocks)
+    pool = [[block for block in blocks_list if type(block) is t] for t in BLOCK_ORDER]
+    position_of = {puzzle.open_bit[puzzle.cell_index(*pos)]: pos for pos in cells}
+    available = sum(position_of)
+    tree_nodes = sum(_probe(board, pool, position_of, available, rng) for _ in range(samples)) / samples
+
+    length = 0
+    kinds = [kind for kind, n in sorted(blocks.items()) for _ in range(n)]
+    for _ in range(samples):
+        chosen = rng.sample(cells, len(kinds)) if len(kinds) <= len(cells) else []
+        length += sum(trace(puzzle, dict(zip(chosen, kinds))).steps)
+    return Estimate(placements, tree_nodes, length / samples)
+
+
+def choose_engine(est, workers=None, have_numpy=None):
+    '''
+    Method choose_engine.
+    Picks the engine expected to solve a puzzle fastest.
+
+    Parameters:
+        est (Estimate): The estimate of the puzzle.
+        workers (int): Number of processes available (defaults to the CPU count).
+        have_numpy (bool): Whether NumPy can be imported (detected if None).
+    Returns:
+        tuple: The engine ('batch', 'dfs' or 'parallel') and the predicted
+        seconds of the pruned DFS and of brute-force batch evaluation.
+    '''
+    if have_numpy is None:
+        have_numpy = importlib.util.find_spec("numpy") is not None
+    workers = workers or os.cpu_count() or 1
+    dfs_seconds = est.tree_nodes * NODE_SECONDS
+    batch_seconds = est.placements * PLACEMENT_SECONDS
+    if have_numpy and batch_seconds < dfs_seconds:
+        engine = "batch"
+    elif workers > 1 and dfs_seconds > PARALLEL_SECONDS:
+        engine = "parallel"
+    else:
+        engine = "dfs"
+    return engine, dfs_seconds, batch_seconds
+
+
+def dispatch_solve(data, workers=None, name="puzzle", est=None):
+    '''
+    Method dispatch_solve.
+    Estimates a puzzle, logs the engine chosen for it and solves it with that engine.
+
+    Parameters:
+        data (dict): Parsed puzzle, as returned by parse_bff.
+        workers (int): Number of processes the parallel engine may use.
+        name (str): Name of the puzzle in the log.
+        est (Estimate): The estimate, if already computed.
+    Returns:
+        tuple: The engine used, and the solution as (position, block type)
+        pairs or None.
+    '''
+    if est is None:
+        est = estimate(data)
+    engine, dfs_seconds, batch_seconds = choose_engine(est, workers)
+    logger.info("%s: %d placements, ~%.0f DFS nodes, trace ~%.0f points -> %s "
+                "(DFS ~%.3fs, batch ~%.3fs)", name, est.placements, est.tree_nodes,
+                est.trace_length, engine, dfs_seconds, batch_seconds)
+    if engine == "batch":
+        from Lazor_vector import batch_solve
+        return engine, batch_solve(data)
+    if engine == "parallel":
+        from Lazor_parallel import parallel_solve
+        return engine, parallel_solve(data, workers)
+    board = setup(data)
+    if dfs_solve(board, make_blocks(data["blocks"]), board.puzzle.open_cells(), SearchStats()) is None:
+        return engine, None
+    return engine, placement_of(board.puzzle, board.state())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Estimate Lazor puzzles and solve each with the engine that suits it.")
+    parser.add_argument("paths", nargs="+", help=".bff files, glob patterns or directories")
+    parser.add_argument("--workers", type=int, default=None, help="processes for the parallel engine")
+    parser.add_argument("--estimate-only", action="store_true", help="only log the estimates and engines")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    estimates = {}
+    for file_name in find_bff_files(args.paths):
+        data = load_files([file_name])[file_name]
+        estimates[file_name] = (data, estimate(data))
+    # Cheapest predicted first, so quick results are not held up by long searches
+    order = sorted(estimates, key=lambda f: min(choose_engine(estimates[f][1], args.workers)[1:]))
+    for file_name in order:
+        data, est = estimates[file_name]
+        if args.estimate_only:
+            engine, dfs_seconds, batch_seconds = choose_engine(est, args.workers)
+            logger.info("%s: %d placements, ~%.0f DFS nodes, trace ~%.0f points -> %s",
+                        file_name, est.placements, est.tree_nodes, est.trace_length, engine)
+            continue
+        start = time.perf_counter()
+        engine, result = dispatch_solve(data, args.workers, file_name, est)
+        logger.info("%s: %s with %s in %.3fs", file_name, "solved" if result else "no solution",
+                    engine, time.perf_counter() - start)
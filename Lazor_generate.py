@@ -0,0 +1,184 @@
+'''
+EN.640.635 Software Carpentry at JHU
+Lazer Group Project
+Group： Weiting Yu, Yilin Li
+
+Lazor Game Solver - Synthetic Puzzle Generator
+This script makes random puzzles of any size for stress and scaling tests.
+A puzzle is built around a planted solution: the blocks are put on random
+open cells, the lasers are traced through them and the targets are chosen
+among the points the beams pass, so every generated puzzle can be solved.
+Puzzles are written as .bff files that parse_bff reads, and a scaling run
+benchmarks the solver on a series of growing grids.
+
+    python Lazor_generate.py --sizes 4 6 8 10 12 --blocks A=4,C=1 --output generated/ --bench
+
+
+'''
+
+from Lazor_parse import parse_bff, load_files
+from Lazor_trace import Puzzle, trace
+import argparse
+import os
+import random
+
+
+def _beam_points(result):
+    """Returns the points on the beam segments of a trace, in order, each once"""
+    points = {}
+    for (x0, y0), (x1, y1) in result.segments:
+        sx, sy = (x1 > x0) - (x1 < x0), (y1 > y0) - (y1 < y0)
+        for i in range(abs(x1 - x0) + 1):
+            points[(x0 + i * sx, y0 + i * sy)] = None
+    return list(points)
+
+
+def generate(cols, rows, blocked=0.15, blocks=None, lasers=1, targets=3, seed=0, attempts=100):
+    '''
+    Method generate.
+    Generates a solvable puzzle with a planted solution.
+
+    The blocks are planted one at a time, each on a free open cell the beams
+    of the blocks before it touch (any free cell once the beams touch none),
+    so they change the beams as in a real level. The targets are taken first
+    among the points the beams only pass with the planted blocks in place,
+    then among the other points of the beams. Layouts whose beams pass too
+    few points for the targets asked, or pass them all without blocks, are
+    drawn again.
+
+    Parameters:
+        cols (int): Number of grid columns.
+        rows (int): Number of grid rows.
+        blocked (float): Share of the cells that are 'x' (no block allowed).
+        blocks (dict): Number of blocks of each type to place, e.g.
+            {'A': 3, 'C': 1}; defaults to three reflect blocks.
+        lasers (int): Number of lasers.
+        targets (int): Number of target points.
+        seed (int): Seed of the random generator; the same arguments and seed
+            give the same puzzle.
+        attempts (int): Number of layouts drawn before giving up.
+    Returns:
+        tuple: The puzzle as parse_bff returns it and the planted solution as
+        (position, block type) pairs.
+    Raises:
+        ValueError: If the blocks do not fit on the open cells, or no layout
+            gave enough beam points for the targets.
+    '''
+    blocks = {kind: n for kind, n in (blocks or {"A": 3}).items() if n}
+    rng = random.Random(seed)
+    n_blocks = sum(blocks.values())
+    # Points with exactly one odd coordinate lie on a cell edge
+    spots = [(x, y) for y in range(rows * 2 + 1) for x in range(cols * 2 + 1) if (x + y) % 2]
+    for _ in range(attempts):
+        cells = [(x, y) for y in range(rows) for x in range(cols)]
+        closed = set(rng.sample(cells, round(blocked * len(cells))))
+        grid = [['x' if (x, y) in closed else 'o' for x in range(cols)] for y in range(rows)]
+        open_cells = [cell for cell in cells if cell not in closed]
+        if n_blocks > len(open_cells):
+            raise ValueError(f"{n_blocks} blocks do not fit on {len(open_cells)} open cells")
+        kinds = [kind for kind in sorted(blocks) for _ in range(blocks[kind])]
+        rng.shuffle(kinds)
+        beams = [rng.choice(spots) + (rng.choice((-1, 1)), rng.choice((-1, 1))) for _ in range(lasers)]
+        puzzle = Puzzle(grid, beams, [])
+        placement = {}
+        for kind in kinds:
+            free = [cell for cell in open_cells if cell not in placement]
+            touched_cells = trace(puzzle, placement).cells
+            touched = [cell for cell in free if cell in touched_cells]
+            placement[rng.choice(touched or free)] = kind
+
+        passed = _beam_points(trace(puzzle, placement))
+        empty = set(_beam_points(trace(puzzle, {})))
+        starts = {(x, y) for x, y, _, _ in beams}
+        planted = [p for p in passed if p not in empty and p not in starts]
+        other = [p for p in passed if p in empty and p not in starts]
+        if len(planted) + len(other) < targets or (targets and not planted):
+            continue
+        chosen = rng.sample(planted, min(targets, len(planted)))
+        chosen += rng.sample(other, targets - len(chosen))
+        data = {"grid": grid, "blocks": blocks, "lasers": beams, "points": sorted(chosen)}
+        solution = tuple(sorted(placement.items(), key=lambda item: (item[1], item[0][1], item[0][0])))
+        return data, solution
+    raise ValueError(f"no layout in {attempts} attempts passes {targets} target points")
+
+
+def to_bff(data, comment=None):
+    '''
+    Method to_bff.
+    Writes a puzzle in the .bff format read by parse_bff.
+
+    Parameters:
+        data (dict): The puzzle, as parse_bff returns it.
+        comment (str): Optional text put at the top as # comment lines.
+    Returns:
+        str: The contents of the .bff file.
+    '''
+    lines = [f"# {line}" for line in (comment or "").splitlines()]
+    lines += ["", "GRID START"] + [" ".join(row) for row in data["grid"]] + ["GRID STOP", ""]
+    lines += [f"{kind} {n}" for kind, n in sorted(data["blocks"].items())] + [""]
+    lines += ["L " + " ".join(map(str, laser)) for laser in data["lasers"]] + [""]
+    lines += [f"P {x} {y}" for x, y in data["points"]]
+    return "\n".join(lines) + "\n"
+
+
+def write_puzzle(path, data, solution, seed=None):
+    '''
+    Method write_puzzle.
+    Saves a generated puzzle as a .bff file, with its planted solution as a comment.
+
+    Parameters:
+        path (str): The .bff file to write.
+        data (dict): The puzzle.
+        solution (tuple): The planted solution as (position, block type) pairs.
+        seed (int): The seed it was generated with, noted in the comment.
+    '''
+    comment = f"Generated by Lazor_generate, seed {seed}\nPlanted solution: " + \
+        " ".join(f"{kind}@{x},{y}" for (x, y), kind in solution)
+    text = to_bff(data, comment)
+    # Never write a file the parser would read differently
+    if parse_bff(text) != data:
+        raise ValueError("the puzzle does not survive a round trip through parse_bff")
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def _parse_blocks(text):
+    """Parses a block mix such as 'A=4,C=1'"""
+    return {kind.strip(): int(n) for kind, n in (item.split("=") for item in text.split(","))}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate solvable Lazor puzzles for stress and scaling tests.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[4, 6, 8, 10, 12], help="square grid sizes")
+    parser.add_argument("--blocked", type=float, default=0.15, help="share of 'x' cells")
+    parser.add_argument("--blocks", type=_parse_blocks, default={"A": 3}, help="block mix, e.g. A=4,B=1,C=1")
+    parser.add_argument("--lasers", type=int, default=1, help="lasers per puzzle")
+    parser.add_argument("--targets", type=int, default=3, help="targets per puzzle")
+    parser.add_argument("--count", type=int, default=1, help="puzzles per size")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first puzzle")
+    parser.add_argument("--output", default="generated", help="directory to write the .bff files to")
+    parser.add_argument("--bench", action="store_true", help="benchmark the solver on the generated puzzles")
+    parser.add_argument("--repeats", type=int, default=1, help="timed runs per puzzle with --bench")
+    args = parser.parse_args()
+
+    os.makedirs(args.output, exist_ok=True)
+    files = []
+    for size in args.sizes:
+        for i in range(args.count):
+            seed = args.seed + i
+            data, solution = generate(size, size, args.blocked, args.blocks, args.lasers, args.targets, seed)
+            path = os.path.join(args.output, f"gen_{size}x{size}_{seed}.bff")
+            write_puzzle(path, data, solution, seed)
+            files.append(path)
+    print(f"{len(files)} puzzles written to {args.output}")
+
+    if args.bench:
+        from Lazor_benchmark import run_level
+        from Lazor_solver_finalversion import count_placements
+        print(f"{'puzzle':32} {'placements':>14} {'ms':>10} {'nodes':>9} {'KiB':>9}")
+        for path in files:
+            result = run_level(path, args.repeats)
+            data = load_files([path])[path]
+            placements = count_placements(len(Puzzle.from_data(data).open_cells()), data["blocks"])
+            print(f"{path:32} {placements:14} {result['seconds'] * 1000:10.2f} {result['nodes']:9} "
+                  f"{result['peak_kib']:9.1f}{'' if result['solved'] else '  UNSOLVED'}")
@@ -0,0 +1,298 @@
+'''
+EN.640.635 Software Carpentry at JHU
+Lazer Group Project
+Group： Weiting Yu, Yilin Li
+
+Lazor Game Solver - Instrumentation
+This script shows where the time of a solve goes. An Instrumentation object
+handed to dfs_solve counts the search nodes, leaves and prunes, the retraces,
+beam steps and refract splits of the board, times the tracing apart from the
+branching, and calls progress hooks with snapshots of those numbers while the
+search runs. Without one, dfs_solve runs exactly as before. For a closer look
+a single puzzle can be profiled with cProfile, or sampled into collapsed
+stacks for a flame graph.
+
+    python Lazor_instrument.py mad_7.bff --progress 0.5 --profile mad_7.prof --collapsed mad_7.folded
+
+
+'''
+
+from Lazor_parse import load_files
+from Lazor_solver_finalversion import setup, make_blocks, dfs_solve, SearchStats
+from collections import Counter
+import argparse
+import cProfile
+import json
+import pstats
+import sys
+import threading
+import time
+
+
+class Instrumentation:
+    '''
+    Counters, phase timers and progress hooks for one dfs_solve call.
+
+    dfs_solve calls attach when the search starts and detach when it ends.
+    While attached, the board's place_block, remove_block and simulate are
+    wrapped by timed versions on the instance, and the search calls is_set
+    every 64 nodes (it stands in for the cancel event), which is where the
+    hooks are run. Nothing is wrapped or checked when no instrumentation is
+    given, so the uninstrumented search pays nothing for it.
+
+    Attributes:
+        stats (SearchStats): Search counters of the attached dfs_solve.
+        timers (dict): Seconds spent per phase: "search" (the whole
+            dfs_solve), "trace" (retracing the beams after a block is placed
+            or removed) and "simulate" (full Board.simulate calls).
+        simulations (int): Number of Board.simulate calls.
+        hooks (list): Callables given a snapshot dict every interval seconds.
+        interval (float): Seconds between two progress snapshots.
+        cancel (Event): Optional event that stops the search when set.
+    '''
+
+    def __init__(self, hooks=(), interval=1.0, cancel=None):
+        self.stats = SearchStats()
+        self.timers = {"search": 0.0, "trace": 0.0, "simulate": 0.0}
+        self.simulations = 0
+        self._sim_steps = 0
+        self._sim_splits = 0
+        self.hooks = list(hooks)
+        self.interval = interval
+        self.cancel = cancel
+        self._board = None
+        self._tracer = None
+        self._base = (0, 0, 0)
+        self._start = None
+        self._next = 0.0
+
+    def add_hook(self, hook):
+        """Registers a callable to be given progress snapshots"""
+        self.hooks.append(hook)
+
+    def attach(self, board, stats):
+        '''
+        Method attach.
+        Starts instrumenting a search on a board.
+
+        Parameters:
+            board (Board): The board the search places blocks on.
+            stats (SearchStats): The counters the search updates.
+        '''
+        self.stats = stats
+        self._board = board
+        self._tracer = board.tracer
+        # Counters of the tracer run from its creation; report this search only
+        self._base = (board.tracer.updates, board.tracer.traced, board.tracer.splits)
+        timers = self.timers
+        place_block, remove_block, simulate = board.place_block, board.remove_block, board.simulate
+
+        def timed_place(block, position):
+            start = time.perf_counter()
+            try:
+                return place_block(block, position)
+            finally:
+                timers["trace"] += time.perf_counter() - start
+
+        def timed_remove(position):
+            start = time.perf_counter()
+            try:
+                return remove_block(position)
+            finally:
+                timers["trace"] += time.perf_counter() - start
+
+        def timed_simulate():
+            start = time.perf_counter()
+            try:
+                result = simulate()
+            finally:
+                timers["simulate"] += time.perf_counter() - start
+            self.simulations += 1
+            self._sim_steps += sum(result.steps)
+            self._sim_splits += len(result.steps) - len(board.puzzle.lasers)
+            return result
+
+        board.place_block, board.remove_block, board.simulate = timed_place, timed_remove, timed_simulate
+        self._start = time.perf_counter()
+        self._next = self._start + self.interval
+
+    def detach(self):
+        """Stops the search timer, restores the board's methods and sends a last snapshot"""
+        self.timers["search"] += time.perf_counter() - self._start
+        for name in ("place_block", "remove_block", "simulate"):
+            vars(self._board).pop(name, None)
+        self._board = None
+        snapshot = self.snapshot()
+        for hook in self.hooks:
+            hook(snapshot)
+
+    def is_set(self):
+        '''
+        Method is_set.
+        Called by the search every 64 nodes: sends a snapshot to the hooks
+        once the interval has passed, then reports whether the search should stop.
+
+        Returns:
+            bool: True if the cancel event given at creation is set.
+        '''
+        if self.hooks:
+            now = time.perf_counter()
+            if now >= self._next:
+                self._next = now + self.interval
+                snapshot = self.snapshot()
+                for hook in self.hooks:
+                    hook(snapshot)
+        return self.cancel is not None and self.cancel.is_set()
+
+    def snapshot(self):
+        '''
+        Method snapshot.
+        Collects the current counters and timers.
+
+        Returns:
+            dict: nodes, leaves, pruned, dead_fills, sealed, transpositions,
+            traces (cell changes retraced), beam_steps (event states traced),
+            refract_splits (beams started by refract blocks), simulations and
+            their steps and splits, the phase timers in seconds, with
+            "branch" the search time outside tracing, and elapsed.
+        '''
+        snapshot = dict(vars(self.stats))
+        updates = traced = splits = 0
+        if self._tracer is not None:
+            updates, traced, splits = (now - base for now, base in zip(
+                (self._tracer.updates, self._tracer.traced, self._tracer.splits), self._base))
+        snapshot.update(traces=updates, beam_steps=traced + self._sim_steps,
+                        refract_splits=splits + self._sim_splits, simulations=self.simulations)
+        timers = dict(self.timers)
+        elapsed = timers["search"]
+        if self._board is not None:
+            elapsed += time.perf_counter() - self._start
+        timers["branch"] = max(elapsed - timers["trace"] - timers["simulate"], 0.0)
+        snapshot["timers"] = timers
+        snapshot["elapsed"] = elapsed
+        return snapshot
+
+
+def instrumented_solve(data, hooks=(), interval=1.0):
+    '''
+    Method instrumented_solve.
+    Solves a puzzle with dfs_solve under instrumentation.
+
+    Parameters:
+        data (dict): Parsed puzzle, as returned by parse_bff.
+        hooks (list): Callables given progress snapshots.
+        interval (float): Seconds between two progress snapshots.
+    Returns:
+        tuple: The solved Board (or None) and the final snapshot, whose
+        timers also hold "setup", the time taken to build the board.
+    '''
+    start = time.perf_counter()
+    board = setup(data)
+    setup_seconds = time.perf_counter() - start
+    instrument = Instrumentation(hooks, interval)
+    solved = dfs_solve(board, make_blocks(data["blocks"]), board.puzzle.open_cells(),
+                       instrument=instrument)
+    snapshot = instrument.snapshot()
+    snapshot["timers"]["setup"] = setup_seconds
+    return solved, snapshot
+
+
+def profile_solve(data, path=None, sort="cumulative"):
+    '''
+    Method profile_solve.
+    Solves a puzzle under cProfile.
+
+    Parameters:
+        data (dict): Parsed puzzle, as returned by parse_bff.
+        path (str): If given, the profile is dumped there for pstats or snakeviz.
+        sort (str): Sort key of the returned statistics.
+    Returns:
+        pstats.Stats: The profile of setup plus dfs_solve.
+    '''
+    profiler = cProfile.Profile()
+    profiler.enable()
+    board = setup(data)
+    dfs_solve(board, make_blocks(data["blocks"]), board.puzzle.open_cells())
+    profiler.disable()
+    if path:
+        profiler.dump_stats(path)
+    return pstats.Stats(profiler).sort_stats(sort)
+
+
+def _stack_of(frame):
+    """Returns the collapsed-stack name of a frame and its callers, outermost first"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def sample_solve(data, interval=0.0005):
+    '''
+    Method sample_solve.
+    Solves a puzzle while a thread samples the solving thread's stack.
+
+    Parameters:
+        data (dict): Parsed puzzle, as returned by parse_bff.
+        interval (float): Seconds between two samples.
+    Returns:
+        Counter: Number of samples per stack, each stack a ";"-joined string
+        of "function (file:line)" frames, outermost first.
+    '''
+    samples = Counter()
+    target = threading.get_ident()
+    done = threading.Event()
+
+    def sampler():
+        while not done.wait(interval):
+            frame = sys._current_frames().get(target)
+            if frame is not None:
+                samples[_stack_of(frame)] += 1
+
+    # The sampler only runs when the solving thread lets go of the GIL
+    switch = sys.getswitchinterval()
+    sys.setswitchinterval(min(switch, interval))
+    thread = threading.Thread(target=sampler, daemon=True)
+    thread.start()
+    try:
+        board = setup(data)
+        dfs_solve(board, make_blocks(data["blocks"]), board.puzzle.open_cells())
+    finally:
+        done.set()
+        thread.join()
+        sys.setswitchinterval(switch)
+    return samples
+
+
+def write_collapsed(samples, path):
+    """Writes stack samples in the collapsed format read by flamegraph.pl and speedscope"""
+    with open(path, "w") as f:
+        for stack, count in sorted(samples.items()):
+            f.write(f"{stack} {count}\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Instrument or profile dfs_solve on one Lazor puzzle.")
+    parser.add_argument("file", help=".bff file to solve")
+    parser.add_argument("--progress", type=float, default=None, metavar="SECONDS",
+                        help="print a progress snapshot every SECONDS")
+    parser.add_argument("--profile", default=None, help="dump a cProfile profile to this file")
+    parser.add_argument("--collapsed", default=None, help="write sampled collapsed stacks to this file")
+    args = parser.parse_args()
+
+    data = load_files([args.file])[args.file]
+    hooks = []
+    if args.progress is not None:
+        hooks.append(lambda s: print(f"{s['elapsed']:8.3f}s {s['nodes']:10} nodes {s['beam_steps']:12} steps"))
+    board, snapshot = instrumented_solve(data, hooks, args.progress or 1.0)
+    print("solved" if board is not None else "no solution")
+    print(json.dumps(snapshot, indent=2))
+
+    if args.profile:
+        profile_solve(data, args.profile).print_stats(15)
+    if args.collapsed:
+        samples = sample_solve(data)
+        write_collapsed(samples, args.collapsed)
+        print(f"{sum(samples.values())} samples written to {args.collapsed}")
@@ -0,0 +1,183 @@
+'''
+EN.640.635 Software Carpentry at JHU
+Lazer Group Project
+Group： Weiting Yu, Yilin Li
+
+Lazor Game Solver - Parallel Search
+This script splits the placement tree of the DFS solver at a fixed depth into
+independent subproblems and solves them on a pool of worker processes. In the
+default mode the remaining work is cancelled as soon as one worker finds a
+solution; in enumerate-all mode the solutions of all subproblems are merged.
+
+
+'''
+
+from Lazor_parse import load_files
+from Lazor_solver_finalversion import (setup, make_blocks, place_state, placement_of, search,
+                                       Subproblem, SearchStats, SearchCancelled, BLOCK_ORDER)
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import argparse
+import multiprocessing
+import os
+import time
+
+# Per-process state of a worker, set up once by _init_worker
+_worker = {}
+
+
+def _init_worker(data, cancel):
+    """Builds the board a worker process solves its subproblems on"""
+    _worker["data"] = data
+    _worker["board"] = setup(data)
+    _worker["cancel"] = cancel
+
+
+def _solve_subproblem(subproblem, find_all):
+    '''
+    Method _solve_subproblem.
+    Runs the search below one subproblem on the worker's board.
+
+    Parameters:
+        subproblem (Subproblem): The subtree to search.
+        find_all (bool): Whether to collect every solution or stop at the first.
+    Returns:
+        tuple: The solution states found (a list) and the search counters (a dict).
+    '''
+    board = _worker["board"]
+    blocks = make_blocks(_worker["data"]["blocks"])
+    pool = [[block for block in blocks if type(block) is t] for t in BLOCK_ORDER]
+    place_state(board, pool, subproblem.state)
+    stats = SearchStats()
+    solutions = []
+    try:
+        for state in search(board, [b for group in pool for b in group], board.puzzle.open_cells(),
+                            stats, subproblem.excluded, cancel=_worker["cancel"]):
+            solutions.append(state)
+            if not find_all:
+                break
+    except SearchCancelled:
+        pass
+    # Leave the board empty for the next subproblem
+    for position in list(board.placement()):
+        board.remove_block(position)
+    return solutions, vars(stats)
+
+
+def split(data, depth, stats=None):
+    '''
+    Method split.
+    Splits the placement tree of a puzzle into independent subproblems.
+
+    Parameters:
+        data (dict): Parsed puzzle, as returned by parse_bff.
+        depth (int): Number of blocks placed at the root of each subproblem.
+        stats (SearchStats): Optional counters updated for the nodes above depth.
+    Returns:
+        tuple: The subproblems, and the solution states found above depth.
+    '''
+    if stats is None:
+        stats = SearchStats()
+    board = setup(data)
+    subproblems, solutions = [], []
+    for item in search(board, make_blocks(data["blocks"]), board.puzzle.open_cells(), stats, depth=depth):
+        (subproblems if isinstance(item, Subproblem) else solutions).append(item)
+    return subproblems, solutions
+
+
+def parallel_solve(data, workers=None, split_depth=2, find_all=False, stats=None):
+    '''
+    Method parallel_solve.
+    Solves a puzzle by searching the subproblems of split on a process pool.
+
+    Parameters:
+        data (dict): Parsed puzzle, as returned by parse_bff.
+        workers (int): Number of worker processes (defaults to the CPU count).
+        split_depth (int): Depth at which the placement tree is split.
+        find_all (bool): Whether to enumerate every solution.
+        stats (SearchStats): Optional counters merged from all processes.
+    Returns:
+        tuple or list: The first solution found, as (position, block type)
+        pairs, or None; with find_all, the list of all solutions.
+    '''
+    if stats is None:
+        stats = SearchStats()
+    puzzle = setup(data).puzzle
+    subproblems, states = split(data, split_depth, stats)
+    if states and not find_all:
+        return placement_of(puzzle, states[0])
+
+    cancel = multiprocessing.Event()
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_init_worker,
+                             initargs=(data, cancel)) as executor:
+        pending = {executor.submit(_solve_subproblem, subproblem, find_all) for subproblem in subproblems}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                found, counts = future.result()
+                stats.add(counts)
+                states.extend(found)
+            if states and not find_all:
+                # First solution: stop running subproblems and drop queued ones
+                cancel.set()
+                for future in pending:
+                    future.cancel()
+                for future in pending:
+                    if not future.cancelled():
+                        stats.add(future.result()[1])
+                break
+
+    if find_all:
+        return sorted(placement_of(puzzle, state) for state in states)
+    return placement_of(puzzle, states[0]) if states else None
+
+
+def measure_speedup(data, worker_counts, split_depth=2, find_all=False):
+    '''
+    Method measure_speedup.
+    Times parallel_solve on a puzzle for several worker counts.
+
+    Parameters:
+        data (dict): Parsed puzzle, as returned by parse_bff.
+        worker_counts (list): Worker counts to time, the first one being the baseline.
+        split_depth (int): Depth at which the placement tree is split.
+        find_all (bool): Whether to enumerate every solution.
+    Returns:
+        list: One dict per worker count with workers, seconds, speedup over
+        the baseline and the number of search nodes.
+    '''
+    report = []
+    for workers in worker_counts:
+        stats = SearchStats()
+        start = time.perf_counter()
+        parallel_solve(data, workers, split_depth, find_all, stats)
+        seconds = time.perf_counter() - start
+        base = report[0]["seconds"] if report else seconds
+        report.append({"workers": workers, "seconds": seconds,
+                       "speedup": base / seconds, "nodes": stats.nodes})
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solve a Lazor puzzle on several processes.")
+    parser.add_argument("file", help="the .bff file to solve")
+    parser.add_argument("--workers", type=int, nargs="+", default=[os.cpu_count()],
+                        help="worker counts; several counts print a speedup report")
+    parser.add_argument("--depth", type=int, default=2, help="depth at which the search is split")
+    parser.add_argument("--all", action="store_true", help="enumerate every solution")
+    args = parser.parse_args()
+
+    data = load_files([args.file])[args.file]
+    if len(args.workers) > 1:
+        for row in measure_speedup(data, args.workers, args.depth, args.all):
+            print(f"{row['workers']:>3} workers: {row['seconds']:.3f}s  "
+                  f"speedup {row['speedup']:.2f}  nodes {row['nodes']}")
+    else:
+        result = parallel_solve(data, args.workers[0], args.depth, args.all)
+        if args.all:
+            print(f"{len(result)} solutions found.")
+            for placement in result:
+                print(placement)
+        elif result:
+            print("Solution found!", result)
+        else:
+            print("No solution found.")
@@ -12,6 +12,8 @@ and organizes them into structured data for further processing.
 
 '''
 
+import os
+
 
 def parse_bff(parse_line):
     '''
@@ -78,17 +80,27 @@ def parse_bff(parse_line):
 
 
 
-# List of .bff files to parse
-bff_files = [
-    'dark_1.bff',
-    'mad_1.bff',
-    'mad_4.bff',
-    'mad_7.bff',
-    'numbered_6.bff',
-    'showstopper_4.bff',
-    'tiny_5.bff',
-    'yarn_5.bff'
-]
+def find_bff_files(paths):
+    '''
+    Expands files, glob patterns and directories into a list of .bff files.
+    Parameters:
+        paths (list): File names, glob patterns (e.g. 'mad_*.bff') or directories,
+            which stand for the .bff files directly inside them.
+    Returns:
+        list: The .bff files found, each listed once, in the order given.
+    '''
+    # glob pulls in re, which most imports of the parser never need
+    import glob
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            matches = sorted(glob.glob(os.path.join(path, "*.bff")))
+        elif glob.has_magic(path):
+            matches = sorted(glob.glob(path))
+        else:
+            matches = [path]
+        found.extend(match for match in matches if match not in found)
+    return found
 
 
 def load_files(file_paths):
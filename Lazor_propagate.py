@@ -0,0 +1,468 @@
+'''
+EN.640.635 Software Carpentry at JHU
+Lazer Group Project
+Group： Weiting Yu, Yilin Li
+
+Lazor Game Solver - Constraint Propagation Engine
+This script solves a puzzle by reasoning back from its targets instead of
+searching placements forward. Every open cell has a domain of what may still
+go there: nothing, or a block of type A, B or C. A target can only be hit if
+a beam can route to it through the cells' domains, so values that would cut
+a target off from every laser are removed, the domains are checked against
+the blocks left, and the search only branches on a cell of the target with
+the fewest cells able to route a beam to it. Branches that cannot hit every
+target, or cannot take the blocks left, are proven dead without placing them.
+
+    python Lazor_propagate.py Board/ --compare
+
+
+'''
+
+from Lazor_parse import load_files, find_bff_files
+from Lazor_trace import Puzzle, REFLECT, OPAQUE, REFRACT
+import argparse
+import itertools
+import time
+
+# Domain bits of an open cell: no block, or a block of type A, B or C
+NONE_BIT, A_BIT, B_BIT, C_BIT = 1, 2, 4, 8
+# Values that let a beam pass through the cell, and values that reflect it
+PASSES = NONE_BIT | C_BIT
+TURNS = A_BIT | C_BIT
+BLOCK_BITS = (A_BIT, B_BIT, C_BIT)
+# Edge labels of the beam graph: a beam passes or is reflected at an open cell
+PASS, TURN = 1, 2
+
+
+class PropagationStats:
+    '''
+    Counters collected by the constraint propagation engine.
+
+    Attributes:
+        nodes (int): Number of search nodes visited (including leaves).
+        failures (int): Nodes proven to have no solution by propagation.
+        removed (int): Values taken out of cell domains by propagation.
+        traces (int): Beam graph traversals, to find routes or test a value.
+        leaves (int): Nodes whose decided cells alone hit every target.
+    '''
+
+    def __init__(self):
+        self.nodes = 0
+        self.failures = 0
+        self.removed = 0
+        self.traces = 0
+        self.leaves = 0
+
+
+class ConstraintSolver:
+    '''
+    Solves a puzzle over the domains of its open cells.
+
+    The beams are followed over the event states of Puzzle.moves from the
+    static layer's frontier. With undecided cells, a beam facing an open cell
+    goes on past it if a value in the cell's domain lets it pass (no block or
+    C) and is reflected if one reflects it (A or C); blocks of type B never
+    route a beam anywhere. This relaxed graph holds every beam of every way
+    to fill the undecided cells, so a target it does not reach is missed by
+    all of them, and a value that would leave a target out is removed from
+    the cell's domain. Only cells on the route the traversal found to a
+    target can cut it off, so only their values are tested, and a test only
+    looks for the targets whose route the value would break. Once every
+    cell is decided the graph is the exact trace.
+
+    The block counts are checked with Hall's condition on both sides: the
+    blocks left of every set of types must fit in the cells that can take
+    one of them, and the cells that must take a block of a set of types must
+    not outnumber those blocks. By the Mendelsohn-Dulmage theorem the blocks
+    then fit exactly.
+
+    Branching picks the target with the fewest undecided cells on routes to
+    it, and the first undecided cell on the route found to it; the cell's
+    values split the node, so each solution is found exactly once. A node
+    whose decided cells alone route a beam to every target is solved
+    whatever goes on the other cells, and the blocks left are dropped on them.
+
+    Parameters:
+        data (dict): Parsed puzzle, as returned by parse_bff.
+        stats (PropagationStats): Optional counters updated while solving.
+    '''
+
+    def __init__(self, data, stats=None):
+        self.puzzle = puzzle = Puzzle.from_data(data)
+        self.stats = stats if stats is not None else PropagationStats()
+        self.frontier, static, self.static_mask = puzzle.static_layer()
+        self.cells = puzzle.open_cells()
+        self.totals = tuple(puzzle.blocks.get(kind, 0) for kind in "ABC")
+        # Per event state: the open cell it faces (or -1), the states a beam
+        # goes on to when reflected and when passing (-1 if it cannot, or if
+        # the state is static) and the bit of the target at it
+        face, _, go, bounce, _ = puzzle.moves()
+        slot = {c: i for i, c in enumerate(puzzle.open_index)}
+        n = len(face)
+        self.open_of, self.turn_to, self.pass_to, self.target_bit = [-1] * n, [-1] * n, [-1] * n, [0] * n
+        self.target_states = [[] for _ in puzzle.target_points]
+        for s in range(n):
+            t = puzzle.target_of[s >> 2]
+            if t >= 0 and face[s] >= 0:
+                self.target_bit[s] = 1 << t
+                self.target_states[t].append(s)
+            c = face[s]
+            if c < 0:
+                continue
+            i = slot.get(c, -1)
+            code = puzzle.cells[c]
+            self.open_of[s] = i
+            if (i >= 0 or code == REFLECT or code == REFRACT) and bounce[s] not in static:
+                self.turn_to[s] = bounce[s]
+            if (i >= 0 or code != REFLECT and code != OPAQUE) and go[s] not in static:
+                self.pass_to[s] = go[s]
+        # The edges into each state, as (state before, label)
+        self.into = {}
+        for s in range(n):
+            for m, label in ((self.turn_to[s], TURN), (self.pass_to[s], PASS)):
+                if m >= 0:
+                    self.into.setdefault(m, []).append((s, label))
+
+    def _trace(self, dom):
+        '''
+        Follows the beams over the relaxed graph of the domains.
+
+        Parameters:
+            dom (list): Domain bits of each open cell.
+        Returns:
+            tuple: Mask of the targets reached, the set of states reached,
+            the edge each state was found by, as {state: (state before, open
+            cell or -1, label)}, and the first state found at each target.
+        '''
+        self.stats.traces += 1
+        open_of, turn_to, pass_to, target_bit = self.open_of, self.turn_to, self.pass_to, self.target_bit
+        mask = self.static_mask
+        parent, first = {}, {}
+        seen = set(self.frontier)
+        stack = list(self.frontier)
+        while stack:
+            s = stack.pop()
+            if target_bit[s]:
+                mask |= target_bit[s]
+                first.setdefault(target_bit[s].bit_length() - 1, s)
+            i = open_of[s]
+            turn, passes = turn_to[s], pass_to[s]
+            if i >= 0:
+                d = dom[i]
+                if not d & TURNS:
+                    turn = -1
+                if not d & PASSES:
+                    passes = -1
+            if turn >= 0 and turn not in seen:
+                seen.add(turn)
+                stack.append(turn)
+                parent[turn] = (s, i, TURN)
+            if passes >= 0 and passes not in seen:
+                seen.add(passes)
+                stack.append(passes)
+                parent[passes] = (s, i, PASS)
+        return mask, seen, parent, first
+
+    def _hits(self, dom, strict=False, want=None):
+        '''
+        Finds the targets the relaxed graph of the domains reaches, stopping
+        as soon as it reaches those wanted.
+
+        Parameters:
+            dom (list): Domain bits of each open cell.
+            strict (bool): Let undecided cells route no beam, so that only
+                the targets every filling hits are found.
+            want (int): Mask of the targets looked for; all by default.
+        Returns:
+            int: Mask of the targets reached.
+        '''
+        self.stats.traces += 1
+        open_of, turn_to, pass_to, target_bit = self.open_of, self.turn_to, self.pass_to, self.target_bit
+        if want is None:
+            want = self.puzzle.target_mask
+        mask = self.static_mask
+        seen = set(self.frontier)
+        stack = list(self.frontier)
+        while stack:
+            s = stack.pop()
+            if target_bit[s]:
+                mask |= target_bit[s]
+                if mask & want == want:
+                    break
+            i = open_of[s]
+            if i < 0:
+                turn, passes = turn_to[s], pass_to[s]
+            else:
+                d = dom[i]
+                if strict and d & (d - 1):
+                    continue
+                turn = turn_to[s] if d & TURNS else -1
+                passes = pass_to[s] if d & PASSES else -1
+            if turn >= 0 and turn not in seen:
+                seen.add(turn)
+                stack.append(turn)
+            if passes >= 0 and passes not in seen:
+                seen.add(passes)
+                stack.append(passes)
+        return mask
+
+    def _viable(self, dom, i, value, want):
+        """Checks if the relaxed graph still reaches the targets in want with cell i set to value"""
+        old = dom[i]
+        dom[i] = value
+        try:
+            return self._hits(dom, want=want) & want == want
+        finally:
+            dom[i] = old
+
+    def _counts_fit(self, dom):
+        '''
+        Checks the domains against the blocks left, and removes the values
+        the counts rule out.
+
+        Parameters:
+            dom (list): Domain bits of each open cell, updated in place.
+        Returns:
+            bool: False if the blocks left cannot be placed on the cells.
+        '''
+        while True:
+            left = list(self.totals)
+            undecided = []
+            for i, d in enumerate(dom):
+                if d & (d - 1):
+                    undecided.append(i)
+                elif d != NONE_BIT:
+                    left[BLOCK_BITS.index(d)] -= 1
+            if min(left) < 0:
+                return False
+            # Hall's condition for every set of block types
+            for size in (1, 2, 3):
+                for kinds in itertools.combinations(range(3), size):
+                    bits = sum(BLOCK_BITS[k] for k in kinds)
+                    need = sum(left[k] for k in kinds)
+                    if sum(1 for i in undecided if dom[i] & bits) < need:
+                        return False
+                    if sum(1 for i in undecided if not dom[i] & ~bits) > need:
+                        return False
+            strip = sum(bit for bit, n in zip(BLOCK_BITS, left) if n == 0)
+            if sum(left) == len(undecided):
+                strip |= NONE_BIT
+            changed = False
+            for i in undecided:
+                if dom[i] & strip:
+                    if not dom[i] & ~strip:
+                        return False
+                    self.stats.removed += bin(dom[i] & strip).count("1")
+                    dom[i] &= ~strip
+                    changed = True
+            if not changed:
+                return True
+
+    def _propagate(self, dom):
+        '''
+        Removes the values that cannot be part of a solution, until nothing changes.
+
+        Parameters:
+            dom (list): Domain bits of each open cell, updated in place.
+        Returns:
+            tuple: None if the node has no solution; otherwise the mask of
+            the targets the decided cells alone hit, and unless that is all of
+            them, the states reached, the edge each was found by and the
+            first state found at each target (see _trace).
+        '''
+        target_mask = self.puzzle.target_mask
+        while True:
+            if not self._counts_fit(dom):
+                return None
+            strict = self._hits(dom, strict=True)
+            if strict == target_mask:
+                return strict, None, None, None
+            mask, seen, parent, first = self._trace(dom)
+            if mask != target_mask:
+                return None
+            # For each open cell, the targets not hit for sure whose route
+            # found passes it and is reflected by it, indexed by label
+            # (entry 0 stays empty)
+            used = {}
+            for t, s in first.items():
+                if strict >> t & 1:
+                    continue
+                while s in parent:
+                    s, i, label = parent[s]
+                    if i >= 0:
+                        if i not in used:
+                            used[i] = [0, 0, 0]
+                        used[i][label] |= 1 << t
+            changed = False
+            for i, routes in used.items():
+                d = dom[i]
+                if not d & (d - 1):
+                    continue
+                # A value can only cut off the targets whose route uses a
+                # label it lacks; the others keep their route
+                for value, lacks in ((A_BIT, PASS), (NONE_BIT, TURN), (B_BIT, PASS | TURN)):
+                    want = routes[lacks & PASS] | routes[lacks & TURN]
+                    if d & value and want and not self._viable(dom, i, value, want):
+                        d &= ~value
+                        # B routes no beam, so it goes with A or no block
+                        if value != B_BIT:
+                            d &= ~B_BIT
+                if d != dom[i]:
+                    if not d:
+                        return None
+                    self.stats.removed += bin(dom[i] & ~d).count("1")
+                    dom[i] = d
+                    changed = True
+            if not changed:
+                return strict, seen, parent, first
+
+    def _branch(self, dom, strict, seen, parent, first):
+        """Returns the cell to branch on and its values in the order to try them"""
+        open_of, into = self.open_of, self.into
+        best = None
+        for t, s in sorted(first.items()):
+            if strict >> t & 1:
+                continue
+            # The undecided cells on any route into the target
+            cells = set()
+            stack = [n for n in self.target_states[t] if n in seen]
+            found = set(stack)
+            while stack:
+                n = stack.pop()
+                for prev, label in into.get(n, ()):
+                    if prev not in seen:
+                        continue
+                    i = open_of[prev]
+                    if i >= 0:
+                        d = dom[i]
+                        if not d & (TURNS if label == TURN else PASSES):
+                            continue
+                        if d & (d - 1):
+                            cells.add(i)
+                    if prev not in found:
+                        found.add(prev)
+                        stack.append(prev)
+            if best is None or len(cells) < best[0]:
+                best = (len(cells), t)
+        # The first undecided cell on the route found to the target
+        s = first[best[1]]
+        while s in parent:
+            s, i, label = parent[s]
+            if i >= 0 and dom[i] & (dom[i] - 1):
+                cell = i, label
+        i, label = cell
+        if label == TURN:
+            return i, (A_BIT, C_BIT, NONE_BIT, B_BIT)
+        return i, (NONE_BIT, C_BIT, A_BIT, B_BIT)
+
+    def _fill(self, dom, free, left):
+        """Yields each way to give the cells in free (on which no target depends) the blocks left"""
+        if not free:
+            if not any(left):
+                yield dom
+            return
+        if sum(left) > len(free):
+            return
+        i, rest = free[0], free[1:]
+        d = dom[i]
+        for k, bit in enumerate((NONE_BIT,) + BLOCK_BITS):
+            if not d & bit or (k and not left[k - 1]):
+                continue
+            dom[i] = bit
+            if k:
+                left[k - 1] -= 1
+            yield from self._fill(dom, rest, left)
+            if k:
+                left[k - 1] += 1
+        dom[i] = d
+
+    def _search(self, dom):
+        """Yields the complete domains of the solutions below a node"""
+        self.stats.nodes += 1
+        found = self._propagate(dom)
+        if found is None:
+            self.stats.failures += 1
+            return
+        strict = found[0]
+        if strict == self.puzzle.target_mask:
+            # The decided cells hit every target, whatever goes on the others
+            self.stats.leaves += 1
+            free = [i for i, d in enumerate(dom) if d & (d - 1)]
+            left = list(self.totals)
+            for d in dom:
+                if d in BLOCK_BITS:
+                    left[BLOCK_BITS.index(d)] -= 1
+            yield from self._fill(dom, free, left)
+            return
+        i, order = self._branch(dom, *found)
+        for value in order:
+            if dom[i] & value:
+                child = list(dom)
+                child[i] = value
+                yield from self._search(child)
+
+    def placement(self, dom):
+        """Converts complete domains to (position, block type) pairs, as placement_of returns them"""
+        return tuple((self.cells[i], kind) for bit, kind in zip(BLOCK_BITS, "ABC")
+                     for i, d in enumerate(dom) if d == bit)
+
+    def solutions(self):
+        '''
+        Method solutions.
+        Generates the solutions of the puzzle.
+
+        Returns:
+            generator: (position, block type) tuples, as placement_of returns
+            them, each distinct placement once.
+        '''
+        for dom in self._search([NONE_BIT | A_BIT | B_BIT | C_BIT] * len(self.cells)):
+            yield self.placement(dom)
+
+
+def propagate_solve(data, find_all=False, stats=None):
+    '''
+    Method propagate_solve.
+    Solves a puzzle with the constraint propagation engine.
+
+    Parameters:
+        data (dict): Parsed puzzle, as returned by parse_bff.
+        find_all (bool): Return every solution instead of the first.
+        stats (PropagationStats): Optional counters updated while solving.
+    Returns:
+        tuple or list: The first solution as (position, block type) pairs,
+        or None if there is none; with find_all, the list of solutions.
+    '''
+    solutions = ConstraintSolver(data, stats).solutions()
+    if find_all:
+        return list(solutions)
+    return next(solutions, None)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solve Lazor puzzles by constraint propagation.")
+    parser.add_argument("paths", nargs="+", help=".bff files, glob patterns or directories")
+    parser.add_argument("--all", action="store_true", help="find every solution")
+    parser.add_argument("--compare", action="store_true", help="also time dfs_solve on each puzzle")
+    args = parser.parse_args()
+
+    from Lazor_solver_finalversion import setup, make_blocks, dfs_solve, SearchStats
+    print(f"{'puzzle':32} {'ms':>9} {'nodes':>7} {'failed':>7} {'traces':>7}"
+          + (f" {'dfs ms':>9} {'dfs nodes':>10}" if args.compare else ""))
+    for file_name in find_bff_files(args.paths):
+        data = load_files([file_name])[file_name]
+        stats = PropagationStats()
+        start = time.perf_counter()
+        result = propagate_solve(data, args.all, stats)
+        line = (f"{file_name:32} {(time.perf_counter() - start) * 1000:9.2f} {stats.nodes:7} "
+                f"{stats.failures:7} {stats.traces:7}")
+        if args.compare:
+            dfs_stats = SearchStats()
+            start = time.perf_counter()
+            board = setup(data)
+            dfs_solve(board, make_blocks(data["blocks"]), board.puzzle.open_cells(), dfs_stats)
+            line += f" {(time.perf_counter() - start) * 1000:9.2f} {dfs_stats.nodes:10}"
+        if args.all:
+            line += f"  {len(result)} solutions"
+        elif result is None:
+            line += "  no solution"
+        print(line)
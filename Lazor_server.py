@@ -0,0 +1,333 @@
+'''
+EN.640.635 Software Carpentry at JHU
+Lazer Group Project
+Group： Weiting Yu, Yilin Li
+
+Lazor Game Solver - Solve Server
+This script keeps a pool of warm worker processes running and serves solve
+requests over HTTP on localhost or on a Unix socket, so that a level costs a
+request instead of a fresh interpreter. POST /solve takes the text of a .bff
+file or a parsed puzzle as JSON and returns the placement as JSON; requests
+beyond the queue limit are turned away with 503, each request can carry a
+deadline, and GET /stats reports throughput and latency percentiles.
+
+    python Lazor_server.py --port 8635 --workers 4
+    curl --data-binary @mad_1.bff http://127.0.0.1:8635/solve
+
+
+'''
+
+from Lazor_api import ENGINES
+from Lazor_parse import parse_bff
+from Lazor_solver_finalversion import SearchCancelled
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import json
+import logging
+import os
+import socketserver
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Number of recent requests the latency percentiles are taken over
+LATENCY_WINDOW = 1000
+
+# Engines that can stop at a deadline (Lazor_api.solve takes seconds only for these)
+DEADLINE_ENGINES = ("auto", "dfs")
+
+
+def _warm_worker():
+    """Imports the solver in a new worker process, before any request needs it"""
+    import Lazor_api  # noqa: F401
+
+
+def _ready():
+    """Returns the worker's pid, to check that the pool has started"""
+    return os.getpid()
+
+
+def _solve_request(data, expires, find_all, limit, engine):
+    '''
+    Method _solve_request.
+    Solves one request in a worker process.
+
+    Parameters:
+        data (dict): Parsed puzzle, as returned by parse_bff.
+        expires (float): time.time() value by which the answer is due, or None.
+        find_all (bool): Whether to return every solution.
+        limit (int): Maximum number of solutions returned, or None.
+        engine (str): Engine passed to Lazor_api.solve.
+    Returns:
+        dict: status ('solved', 'no_solution', 'timeout' or 'error'), the
+        placement as [x, y, type] lists (or the solutions, a list of them),
+        and the seconds the worker spent.
+    '''
+    from Lazor_api import solve
+    start = time.perf_counter()
+    record = {"status": "no_solution"}
+    try:
+        seconds = None if expires is None else expires - time.time()
+        if seconds is not None and seconds <= 0:
+            raise SearchCancelled()
+        result = solve(data, engine, find_all=find_all, limit=limit, seconds=seconds)
+        if find_all or limit is not None:
+            record["solutions"] = [[[x, y, kind] for (x, y), kind in p] for p in result]
+            record["status"] = "solved" if result else "no_solution"
+        elif result is not None:
+            record["placement"] = [[x, y, kind] for (x, y), kind in result]
+            record["status"] = "solved"
+    except SearchCancelled:
+        record["status"] = "timeout"
+    except Exception as error:
+        record["status"] = "error"
+        record["error"] = f"{type(error).__name__}: {error}"
+    record["seconds"] = round(time.perf_counter() - start, 6)
+    return record
+
+
+class SolveService:
+    '''
+    The request queue and worker pool behind the server, independent of how
+    requests arrive.
+
+    At most max_queue requests are queued or being solved at a time; a
+    request beyond that is rejected at once rather than left to wait, so a
+    client can back off and retry.
+
+    Attributes:
+        workers (int): Number of worker processes.
+        max_queue (int): Maximum number of requests queued or running.
+        deadline (float): Seconds allowed to a request that sets no deadline,
+            or None; requests for an engine that cannot stop get none.
+        pending (int): Number of requests queued or running.
+    '''
+
+    def __init__(self, workers=None, max_queue=64, deadline=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.deadline = deadline
+        self.pending = 0
+        self.executor = None
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._finished = deque(maxlen=LATENCY_WINDOW)
+        self._counts = {"requests": 0, "solved": 0, "no_solution": 0, "timeout": 0, "error": 0,
+                        "rejected": 0, "bad_request": 0}
+        self._started = None
+
+    def start(self):
+        """Forks the worker processes and waits until each has imported the solver"""
+        self.executor = ProcessPoolExecutor(self.workers, initializer=_warm_worker)
+        wait([self.executor.submit(_ready) for _ in range(self.workers)])
+        self._started = time.monotonic()
+
+    def close(self):
+        """Stops the workers, dropping the requests still queued"""
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+
+    def _count(self, status, latency=None):
+        """Updates the counters and latency window for a finished request"""
+        with self._lock:
+            self._counts["requests"] += 1
+            self._counts[status] += 1
+            if latency is not None:
+                self._latencies.append(latency)
+                self._finished.append(time.monotonic())
+
+    def solve(self, request):
+        '''
+        Method solve.
+        Queues a request and waits for its answer.
+
+        Parameters:
+            request (dict): Either "bff" (the text of a .bff file) or
+                "puzzle" (a dict as returned by parse_bff), and optionally
+                "deadline" (seconds, counted from now, queueing included),
+                "all" (bool), "limit" (int) and "engine" (see Lazor_api.solve).
+                A deadline is only allowed with the engines in
+                DEADLINE_ENGINES, and the service's default deadline only
+                applies to those.
+        Returns:
+            tuple: The HTTP status code and the JSON-ready answer: 200 with the
+            record of _solve_request, 400 for a malformed request, 503 when
+            the queue is full.
+        '''
+        try:
+            if "bff" in request:
+                data = parse_bff(request["bff"])
+            else:
+                data = request["puzzle"]
+                data = {"grid": [list(row) for row in data["grid"]], "blocks": dict(data["blocks"]),
+                        "lasers": [tuple(i) for i in data["lasers"]], "points": [tuple(i) for i in data["points"]]}
+            if not data["grid"] or not data["lasers"]:
+                raise ValueError("the puzzle has no grid or no lasers")
+            find_all = bool(request.get("all", False))
+            limit = request.get("limit")
+            if limit is not None and (isinstance(limit, bool) or not isinstance(limit, int) or limit < 0):
+                raise ValueError(f"limit must be a non-negative integer, not {limit!r}")
+            engine = request.get("engine", "dfs")
+            if engine not in ENGINES:
+                raise ValueError(f"unknown engine {engine!r}, expected one of {', '.join(ENGINES)}")
+            deadline = request.get("deadline")
+            if deadline is not None:
+                if isinstance(deadline, bool) or not isinstance(deadline, (int, float)) or not deadline >= 0:
+                    raise ValueError(f"deadline must be a number of seconds >= 0, not {deadline!r}")
+                if engine not in DEADLINE_ENGINES:
+                    raise ValueError(f"a deadline needs the {' or '.join(DEADLINE_ENGINES)} engine, not {engine!r}")
+            elif engine in DEADLINE_ENGINES:
+                deadline = self.deadline
+        except (IndexError, KeyError, TypeError, ValueError) as error:
+            self._count("bad_request")
+            return 400, {"status": "bad_request", "error": f"{type(error).__name__}: {error}"}
+
+        with self._lock:
+            full = self.pending >= self.max_queue
+            if not full:
+                self.pending += 1
+        if full:
+            self._count("rejected")
+            return 503, {"status": "rejected", "error": f"queue full ({self.max_queue} requests)"}
+        start = time.perf_counter()
+        try:
+            expires = None if deadline is None else time.time() + deadline
+            record = self.executor.submit(_solve_request, data, expires, find_all, limit, engine).result()
+        finally:
+            with self._lock:
+                self.pending -= 1
+        record["latency"] = round(time.perf_counter() - start, 6)
+        self._count(record["status"], record["latency"])
+        return 200, record
+
+    def stats(self):
+        '''
+        Method stats.
+        Summarises the requests served so far.
+
+        Returns:
+            dict: The request counters, the number of requests queued or
+            running, the uptime, the throughput over the uptime and over the
+            last minute (requests per second), and the 50th, 90th and 99th
+            percentile and maximum latency in milliseconds over the last
+            LATENCY_WINDOW requests.
+        '''
+        with self._lock:
+            stats = dict(self._counts)
+            latencies = sorted(self._latencies)
+            finished = list(self._finished)
+            stats["queued"] = self.pending
+        now = time.monotonic()
+        uptime = now - self._started if self._started is not None else 0.0
+        served = stats["requests"] - stats["rejected"] - stats["bad_request"]
+        recent = sum(1 for t in finished if now - t <= 60)
+        stats["workers"] = self.workers
+        stats["uptime"] = round(uptime, 3)
+        stats["throughput"] = round(served / uptime, 3) if uptime else 0.0
+        stats["throughput_last_minute"] = round(recent / min(uptime, 60), 3) if uptime else 0.0
+        stats["latency_ms"] = {}
+        if latencies:
+            for name, q in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99)):
+                stats["latency_ms"][name] = round(latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000, 3)
+            stats["latency_ms"]["max"] = round(latencies[-1] * 1000, 3)
+        return stats
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Routes POST /solve and GET /stats to the server's SolveService"""
+    server_version = "Lazor/1.0"
+
+    def _reply(self, code, body):
+        """Sends a JSON answer"""
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        if code == 503:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        if self.path == "/stats":
+            self._reply(200, self.server.service.stats())
+        else:
+            self._reply(404, {"status": "not_found"})
+
+    def do_POST(self):
+        if self.path != "/solve":
+            self._reply(404, {"status": "not_found"})
+            return
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode("utf-8")
+        # A JSON object is a request; anything else is taken as .bff text
+        try:
+            request = json.loads(body)
+        except ValueError:
+            request = None
+        if not isinstance(request, dict):
+            request = {"bff": body}
+        self._reply(*self.server.service.solve(request))
+
+    def address_string(self):
+        # Unix socket clients have no address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format, *args):
+        logger.debug("%s %s", self.address_string(), format % args)
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """ThreadingHTTPServer over a Unix socket"""
+    daemon_threads = True
+
+
+def serve(service, host="127.0.0.1", port=8635, unix=None):
+    '''
+    Method serve.
+    Creates the HTTP server of a started SolveService; call serve_forever on it.
+
+    Parameters:
+        service (SolveService): The service answering the requests.
+        host (str): Address to listen on; only localhost is meant to be used.
+        port (int): TCP port, 0 for any free one (see server.server_address).
+        unix (str): Path of a Unix socket to listen on instead of TCP.
+    Returns:
+        socketserver.BaseServer: The server.
+    '''
+    if unix:
+        if os.path.exists(unix):
+            os.remove(unix)
+        server = _UnixHTTPServer(unix, _Handler)
+    else:
+        server = ThreadingHTTPServer((host, port), _Handler)
+    server.service = service
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve Lazor solve requests from a pool of warm workers.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=8635, help="TCP port to listen on")
+    parser.add_argument("--unix", default=None, help="Unix socket to listen on instead of TCP")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--max-queue", type=int, default=64, help="requests queued or running before 503")
+    parser.add_argument("--deadline", type=float, default=None, help="default seconds allowed per request")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    service = SolveService(args.workers, args.max_queue, args.deadline)
+    service.start()
+    server = serve(service, args.host, args.port, args.unix)
+    logger.info("Serving on %s with %d workers", args.unix or "http://%s:%d" % server.server_address[:2],
+                service.workers)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
@@ -12,9 +12,13 @@ if all target points are hit by the lasers.
 '''
 
 from Lazor_parse import load_files
-from Lazor_Board import Board, Laser, ReflectBlock, OpaqueBlock, RefractBlock, Point
-import copy
+from Lazor_Board import Board, Laser, Block, ReflectBlock, OpaqueBlock, RefractBlock, Point, KINDS
+from Lazor_trace import reach
+from collections import namedtuple, OrderedDict
+import itertools
+import math
 import os
+import time
 
 
 def setup(data):
@@ -33,74 +37,460 @@ def setup(data):
     return Board(grid, blocks, lasers, points)
 
 
-def dfs_solve(board, blocks, available_positions):
-    
+# Canonical order of block types: all A blocks are placed first, then B, then C
+BLOCK_ORDER = (ReflectBlock, OpaqueBlock, RefractBlock)
+
+# An unexplored subtree of the search: the placement at its root, as A, B and
+# C bitsets (see Board.state), the (position, type) choices excluded in it, as
+# one bitset per type, and whether a cancelled search had already started its
+# root node (checked it and dropped blocks on dead positions)
+Subproblem = namedtuple("Subproblem", ["state", "excluded", "started"], defaults=(False,))
+
+
+class SearchCancelled(Exception):
+    '''
+    Raised inside a search when its cancel event is set.
+
+    The search takes its blocks back off the board on the way out, and
+    records what it had left to do.
+
+    Attributes:
+        frontier (list): Subproblem records covering exactly the part of the
+            tree not searched yet, in the order the search would have taken
+            them (deepest first).
+    '''
+
+    def __init__(self):
+        super().__init__()
+        self.frontier = []
+
+
+class Deadline:
+    '''
+    A cancel event for search that sets itself once a time limit has passed.
+
+    Attributes:
+        expires (float): time.monotonic() value at which the event is set.
+    '''
+
+    def __init__(self, seconds):
+        self.expires = time.monotonic() + seconds
+
+    def is_set(self):
+        """Checks if the time limit has passed"""
+        return time.monotonic() >= self.expires
+
+
+class SearchStats:
+    '''
+    Counters collected while searching for a solution.
+
+    Attributes:
+        nodes (int): Number of search nodes visited (including leaves).
+        leaves (int): Number of complete placements checked.
+        pruned (int): Free positions skipped at a node because no beam
+            touches them, so a block there could not change the outcome.
+        dead_fills (int): Complete placements finished by dropping the
+            remaining blocks on positions no beam touches.
+        sealed (int): Branches cut because a block closed off every way
+            into a target that is not hit.
+        transpositions (int): Subtrees skipped because the transposition
+            table showed an equivalent one had no solution.
+    '''
+
+    def __init__(self):
+        self.nodes = 0
+        self.leaves = 0
+        self.pruned = 0
+        self.dead_fills = 0
+        self.sealed = 0
+        self.transpositions = 0
+
+    def add(self, counts):
+        """Adds the counters of another search, given as a dict like vars(stats)"""
+        for name, value in counts.items():
+            setattr(self, name, getattr(self, name) + value)
+
+
+class TranspositionTable:
+    '''
+    Keys of search nodes whose subtree was searched without finding a
+    solution, so that equivalent nodes met later can be skipped.
+
+    A key is the bitset of open cells a beam could still touch (see
+    Lazor_trace.reach), the blocks placed on those cells and the number of
+    blocks of each type left. Two placements with the same key have
+    solutions in the same cases: beams never reach the cells where they
+    differ, and both have as many free cells there to drop blocks on.
+
+    The table holds at most max_entries keys (a key takes roughly 200
+    bytes) and evicts the least recently used one beyond that.
+
+    Parameters:
+        max_entries (int): Maximum number of keys kept.
+    Attributes:
+        hits (int): Lookups that found their key.
+        evictions (int): Keys dropped to stay within max_entries.
+    '''
+
+    def __init__(self, max_entries=100000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.evictions = 0
+
+    def __contains__(self, key):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return True
+        return False
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, key):
+        """Records a key whose subtree has no solution"""
+        self.entries[key] = None
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+
+def count_placements(n_positions, blocks):
+    '''
+    Method count_placements.
+    Closed-form number of distinct boards obtained by placing the blocks on the
+    available positions, where blocks of the same type are interchangeable.
+
+    Parameters:
+        n_positions (int): Number of open positions on the board.
+        blocks (dict): Dictionary of block types and their counts.
+    Returns:
+        int: The multinomial n! / (a! b! c! (n - a - b - c)!).
+    '''
+    total = 1
+    for num in blocks.values():
+        total *= math.comb(n_positions, num)
+        n_positions -= num
+    return total
+
+
+def iter_placements(available_positions, blocks):
+    '''
+    Method iter_placements.
+    Generates every distinct placement of the blocks exactly once. The
+    positions of each type are chosen as a combination (A first, then B,
+    then C), so the number of placements is count_placements.
+
+    Parameters:
+        available_positions (list): Positions (x, y) a block may go to.
+        blocks (dict): Dictionary of block types and their counts.
+    Returns:
+        generator: Tuples of (position, block type) pairs.
+    '''
+    types = [t for t in sorted(blocks) if blocks[t]]
+
+    def place(positions, k):
+        if k == len(types):
+            yield ()
+            return
+        for chosen in itertools.combinations(positions, blocks[types[k]]):
+            rest = [pos for pos in positions if pos not in chosen]
+            for tail in place(rest, k + 1):
+                yield tuple((pos, types[k]) for pos in chosen) + tail
+
+    return place(list(available_positions), 0)
+
+
+def make_blocks(blocks):
+    '''
+    Method make_blocks.
+    Creates one block instance per block to place.
+
+    Parameters:
+        blocks (dict): Dictionary of block types and their counts.
+    Returns:
+        list: Block instances, A blocks first, then B, then C.
+    '''
+    return [t((0, 0)) for t in BLOCK_ORDER for _ in range(blocks.get(t.symbol, 0))]
+
+
+def placement_of(puzzle, state):
+    '''
+    Method placement_of.
+    Converts a placement state (see Board.state) to (position, block type) pairs.
+
+    Parameters:
+        puzzle (Puzzle): The puzzle the state belongs to.
+        state (tuple): The A, B and C bitsets over the puzzle's open cells.
+    Returns:
+        tuple: (position, block type) pairs, A blocks first, each type in grid order.
+    '''
+    cells = puzzle.open_cells()
+    return tuple((cells[i], kind) for kind, bits in zip(KINDS, state)
+                 for i in range(bits.bit_length()) if bits >> i & 1)
+
+
+def place_state(board, pool, state):
+    '''
+    Method place_state.
+    Places the blocks of a placement state on the board, taking them from pool.
+
+    Parameters:
+        board (Board): The board to place blocks on.
+        pool (list): Unplaced blocks grouped by type, in the order of BLOCK_ORDER.
+        state (tuple): The A, B and C bitsets to place.
+    '''
+    for (position, kind) in placement_of(board.puzzle, state):
+        board.place_block(pool[KINDS.index(kind)].pop(), position)
+
+
+def dfs_solve(board, blocks, available_positions, stats=None, table=None, instrument=None):
+
     '''
     Method dfs_solve.
     Finds a solution by placing blocks and tracing laser paths.
 
+    A block on a position no beam touches cannot change where the lasers go,
+    so the next block is only placed on a free position the beams of the
+    current placement touch. The board's IncrementalTrace keeps those beams
+    up to date as blocks are placed and removed, retracing only the beams
+    that face the changed position. Once all targets are hit, the blocks
+    left over are dropped on untouched positions. To keep each placement
+    from being reached in several orders, a (position, type) choice tried at
+    a node is excluded from the subtrees of its later siblings.
+
+    Positions, exclusions and the placement itself are kept as bitsets over
+    the puzzle's open cells (see Puzzle.open_bit). A reflect or opaque block
+    that closes off the last way into an unhit target (see
+    Puzzle.target_seals) ends its branch at once.
+
+    A single board is used for the whole search: blocks are placed with
+    Board.place_block and taken back with Board.remove_block on the way out.
+
+    A node with a block no beam touches any more is looked up in a
+    TranspositionTable: different placements of such blocks often leave the
+    same beams, and a subtree equivalent to one already searched in vain is
+    skipped. Since the search stops at the first solution, every subtree it
+    finishes had none.
+
+    Parameters:
+        board (Board): The board to place blocks on.
+        blocks (list): Block instances that still have to be placed.
+        available_positions (list): Positions (x, y) still free for a block.
+        stats (SearchStats): Optional counters updated during the search.
+        table (TranspositionTable): Optional table to use, e.g. to cap its
+            size; a new one with the default cap is used otherwise.
+        instrument (Instrumentation): Optional Lazor_instrument.Instrumentation
+            that times the tracing and reports progress during the search.
     Returns:
-        bool: True if a solution is found where all target points are hit; False otherwise.
+        Board: The solved board, or None if no placement hits all target points.
+    Raises:
+        SearchCancelled: If the cancel event of instrument is set during the search.
     '''
-    
-    """Recursive DFS to solve the Lazor game"""
-
-    # If all blocks are placed, simulate and check if it's a solution
-    if not blocks:
-        board.simulate()
-        if board.check():
+    if stats is None:
+        stats = SearchStats()
+    if table is None:
+        table = TranspositionTable()
+    if instrument is None:
+        for _ in search(board, blocks, available_positions, stats, table=table):
             return board
-        else:
-            return None
+        return None
+    instrument.attach(board, stats)
+    try:
+        for _ in search(board, blocks, available_positions, stats, cancel=instrument, table=table):
+            return board
+        return None
+    finally:
+        instrument.detach()
 
-    # Try placing each remaining block in each available position
-    for i, pos in enumerate(available_positions):
-        for j, block in enumerate(blocks):
-            # Make a deep copy of the board to maintain independence
-            new_board = copy.deepcopy(board)
-            new_board.place_block(block, pos)
 
-            # Update the list of blocks and positions for the recursive call
-            new_blocks = blocks[:j] + blocks[j + 1:]
-            new_positions = available_positions[:i] + available_positions[i + 1:]
+def iter_solutions(data, limit=None, stats=None):
+    '''
+    Method iter_solutions.
+    Lazily generates the solutions of a puzzle, as placement tuples.
 
-            # Recursive call with updated board, blocks, and positions
-            solution = dfs_solve(new_board, new_blocks, new_positions)
-            if solution:
-                return solution
+    The solutions come from search without a transposition table, on a board
+    of their own, so each distinct placement is yielded exactly once (blocks
+    of one type are interchangeable, and a (position, type) choice tried at
+    a node is excluded from its later siblings) and nothing is kept of the
+    solutions already yielded: memory stays the same however many there are.
 
-    # Return None if no solution found
-    return None
+    Parameters:
+        data (dict): Parsed puzzle, as returned by parse_bff.
+        limit (int): If given, stop after this many solutions.
+        stats (SearchStats): Optional counters updated during the search.
+    Returns:
+        generator: (position, block type) tuples, as placement_of returns them.
+    '''
+    if limit is not None and limit <= 0:
+        return
+    board = setup(data)
+    if stats is None:
+        stats = SearchStats()
+    for count, state in enumerate(search(board, make_blocks(data["blocks"]), board.puzzle.open_cells(), stats), 1):
+        yield placement_of(board.puzzle, state)
+        if count == limit:
+            return
 
 
-if __name__ == "__main__":
-    file_name = input("Enter the name of the .bff file to solve (format 'mad_1.bff'): ")
+def search(board, blocks, available_positions, stats, excluded=(0, 0, 0), depth=None, cancel=None,
+           table=None, started=False):
+    '''
+    Method search.
+    The search behind dfs_solve, as a generator. Every placement that hits
+    all targets is yielded exactly once, as board.state(), while it is on
+    the board; resuming the generator takes it back off.
 
-    # Load and parse the specified .bff file
-    parsed_files = load_files([file_name])
-    data = parsed_files[file_name]
+    Parameters:
+        board (Board): The board to place blocks on; blocks already on it
+            form the root of the search.
+        blocks (list): Block instances that still have to be placed.
+        available_positions (list): Positions (x, y) a block may go to.
+        stats (SearchStats): Counters updated during the search.
+        excluded (tuple): Bitsets of (position, type) choices not to make,
+            one per type, as in Subproblem.
+        depth (int): If given, nodes this many blocks below the root are
+            not explored but yielded as Subproblem records.
+        cancel (Event): If given, the search raises SearchCancelled soon
+            after cancel.is_set() becomes true.
+        table (TranspositionTable): If given, subtrees equivalent to one
+            that was finished without a solution are skipped. This is only
+            valid for a search started from the root (no blocks placed,
+            nothing excluded) that is stopped at its first solution, or for
+            the frontier of such a search, resumed in order.
+        started (bool): True if the root is a started node of a cancelled
+            search (see Subproblem); its dead fills are not yielded again.
+    Returns:
+        generator: Solution states, and Subproblem records if depth is given.
+    '''
+    # Unplaced blocks grouped by type, in the order of Board.placed
+    pool = [[block for block in blocks if type(block) is t] for t in BLOCK_ORDER]
+    puzzle = board.puzzle
+    position_of = {puzzle.open_bit[puzzle.cell_index(*pos)]: pos for pos in available_positions}
+    available = sum(position_of)
+    return _dfs_place(board, pool, position_of, available, list(excluded), stats, depth, cancel, table,
+                      not started)
 
-    # Initialize the board using the setup function
-    board = setup(data)
 
-    # Get available positions if it shows 'o' in the board
-    available_positions = [
-        (i, index) for index, row in enumerate(data["grid"]) for i, n in enumerate(row) if n == 'o'
-    ]
+def _dfs_place(board, pool, position_of, available, excluded, stats, depth, cancel, table, fresh=True):
+    """Recursive DFS placing the next block on a position touched by a beam"""
+    tracer = board.tracer
+    if fresh:
+        stats.nodes += 1
+        if cancel is not None and not stats.nodes & 63 and cancel.is_set():
+            # This node is left for later, so it is not counted yet
+            stats.nodes -= 1
+            stop = SearchCancelled()
+            stop.frontier.append(Subproblem(board.state(), tuple(excluded)))
+            raise stop
 
-    # Initialize blocks list
-    blocks = [ReflectBlock((0, 0))] * data["blocks"].get("A", 0) + \
-             [OpaqueBlock((0, 0))] * data["blocks"].get("B", 0) + \
-             [RefractBlock((0, 0))] * data["blocks"].get("C", 0)
+    # If all blocks are placed, check if it's a solution
+    if not any(pool):
+        stats.leaves += 1
+        if tracer.solved():
+            yield board.state()
+        return
 
-    # Solve the board using DFS
-    solution_board = dfs_solve(board, blocks, available_positions)
+    if depth == 0:
+        yield Subproblem(board.state(), tuple(excluded))
+        return
+
+    a, b, c = board.placed
+    key = None
+    # Only a block no beam touches lets another placement share the key
+    if table is not None and (a | b | c) & ~tracer.touched_mask:
+        cells = reach(board.puzzle, tracer.cells)
+        key = (cells, a & cells, b & cells, c & cells, len(pool[0]), len(pool[1]), len(pool[2]))
+        if key in table:
+            stats.transpositions += 1
+            return
+
+    free = available & ~(a | b | c)
+    live = free & tracer.touched_mask
+    dead = free & ~live
+
+    # A started node counted its dead positions and dead fills the first time
+    if fresh:
+        stats.pruned += bin(dead).count("1")
+        # All targets hit: the remaining blocks can go where no beam passes
+        if tracer.solved():
+            for _ in _fill_dead(board, pool, 0, dead, 1, excluded, position_of):
+                stats.leaves += 1
+                stats.dead_fills += 1
+                yield board.state()
+
+    added = [0, 0, 0]
+    while live:
+        bit = live & -live
+        live ^= bit
+        pos = position_of[bit]
+        for g, group in enumerate(pool):
+            if not group or excluded[g] & bit:
+                continue
+            block = group.pop()
+            board.place_block(block, pos)
+            if g < 2 and _seals_target(board, pos):
+                stats.sealed += 1
+            else:
+                try:
+                    yield from _dfs_place(board, pool, position_of, available, excluded, stats,
+                                          None if depth is None else depth - 1, cancel, table)
+                except SearchCancelled as stop:
+                    board.remove_block(pos)
+                    group.append(block)
+                    # The rest of this node: the choices after the one cancelled
+                    excluded[g] |= bit
+                    stop.frontier.append(Subproblem(board.state(), tuple(excluded), True))
+                    for h in range(3):
+                        excluded[h] &= ~(added[h] | (bit if h == g else 0))
+                    raise
+            board.remove_block(pos)
+            group.append(block)
+            # Later siblings must not repeat this choice
+            excluded[g] |= bit
+            added[g] |= bit
+
+    for g in range(3):
+        excluded[g] &= ~added[g]
+    if key is not None:
+        table.add(key)
+
+
+def _seals_target(board, pos):
+    """Checks if the block just placed at pos closed off every way into an unhit target"""
+    puzzle = board.puzzle
+    solid = board.placed[0] | board.placed[1]
+    around = puzzle.cell_targets[puzzle.cell_index(*pos)] & ~board.tracer.hit_mask
+    while around:
+        t = (around & -around).bit_length() - 1
+        around &= around - 1
+        seal = puzzle.target_seals.get(t)
+        if seal is not None and not seal & ~solid:
+            return True
+    return False
+
+
+def _fill_dead(board, pool, g, dead, floor, excluded, position_of):
+    """Yields each way to place the blocks left in pool[g:] on dead positions, those of pool[g] at bits >= floor"""
+    while g < len(pool) and not pool[g]:
+        g, floor = g + 1, 1
+    if g == len(pool):
+        yield
+        return
+    group = pool[g]
+    candidates = dead & ~excluded[g] & -floor
+    while candidates:
+        bit = candidates & -candidates
+        candidates ^= bit
+        block = group.pop()
+        board.place_block(block, position_of[bit])
+        # Identical blocks go to later positions; the next type starts over
+        yield from _fill_dead(board, pool, g, dead & ~bit, bit << 1, excluded, position_of)
+        board.remove_block(position_of[bit])
+        group.append(block)
 
-    if solution_board:
-        print("Solution found!")
-        solution_board.display()
-    else:
-        print("No solution found.")
 
 def save_solution_to_txt(board, bff_filename):
     '''
@@ -113,10 +503,18 @@ def save_solution_to_txt(board, bff_filename):
     # Derive the solution filename from the .bff filename
     solution_filename = os.path.splitext(bff_filename)[0] + "_solution.txt"
     
-    # Prepare the board layout as text
+    # Prepare the board layout as text, with the symbols Board.display uses
     lines = []
     for row in board.grid:
-        line = " ".join(row)
+        cells = []
+        for cell in row:
+            if cell is None:
+                cells.append('.')
+            elif isinstance(cell, Block):
+                cells.append(cell.symbol)
+            else:
+                cells.append(str(cell))
+        line = " ".join(cells)
         lines.append(line)
     
     # Write the solution to a text file
@@ -125,5 +523,35 @@ def save_solution_to_txt(board, bff_filename):
     
     print(f"Solution saved to {solution_filename}")
 
-# Assuming `board` is the final board with the solution and `bff_file` is the name of the .bff file
-save_solution_to_txt(board, "solution")
+
+if __name__ == "__main__":
+    file_name = input("Enter the name of the .bff file to solve (format 'mad_1.bff'): ")
+
+    # Load and parse the specified .bff file
+    parsed_files = load_files([file_name])
+    data = parsed_files[file_name]
+
+    # Initialize the board using the setup function
+    board = setup(data)
+
+    # Get available positions if it shows 'o' in the board
+    available_positions = [
+        (i, index) for index, row in enumerate(data["grid"]) for i, n in enumerate(row) if n == 'o'
+    ]
+
+    # Initialize blocks list
+    blocks = make_blocks(data["blocks"])
+
+    # Solve the board using DFS
+    stats = SearchStats()
+    solution_board = dfs_solve(board, blocks, available_positions, stats)
+    print(f"Nodes: {stats.nodes}, leaves: {stats.leaves}, "
+          f"positions pruned: {stats.pruned}, dead fills: {stats.dead_fills}, "
+          f"sealed: {stats.sealed}")
+
+    if solution_board:
+        print("Solution found!")
+        solution_board.display()
+        save_solution_to_txt(solution_board, file_name)
+    else:
+        print("No solution found.")
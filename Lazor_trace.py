@@ -0,0 +1,674 @@
+'''
+EN.640.635 Software Carpentry at JHU
+Lazer Group Project
+Group： Weiting Yu, Yilin Li
+
+Lazor Game Solver - Laser Tracing
+This script traces the laser beams of a puzzle for a given block placement.
+The tracer is a pure function: it never modifies the puzzle or the placement,
+so the same puzzle can be traced any number of times, from any thread.
+
+Coordinates follow the .bff convention: the step size is half a block, so
+blocks sit on odd coordinates and a laser always has exactly one odd coordinate.
+
+**Classes**
+- Puzzle: Immutable grid, lasers and target points of a parsed .bff file.
+- Trace: Result of tracing a placement (targets hit, beam segments, cells touched, steps).
+
+'''
+
+from collections import namedtuple
+
+
+# Integer codes of the flat cell map. Grid cells are stored at their centre
+# (odd, odd); EMPTY marks the edge and corner points between them and
+# OUTSIDE the one-point ring padding the board.
+EMPTY = 0
+OPEN = 1  # 'o': a block may be placed here
+BLOCKED = 2  # 'x': no block allowed, lasers pass
+REFLECT = 3  # 'A'
+OPAQUE = 4  # 'B'
+REFRACT = 5  # 'C'
+OUTSIDE = 6
+
+CODES = {'o': OPEN, 'x': BLOCKED, 'A': REFLECT, 'B': OPAQUE, 'C': REFRACT}
+
+# Directions are numbered (vx + 1) + (vy + 1) // 2, so d ^ 2 flips vx and
+# d ^ 1 flips vy; a beam state is point index * 4 + direction
+DIRECTIONS = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+
+
+def direction(vx, vy):
+    """Returns the direction number of the velocity (vx, vy)"""
+    return vx + 1 + ((vy + 1) >> 1)
+
+# Result of trace(): the target points hit, the straight beam segments as
+# ((x0, y0), (x1, y1)) pairs, the block cells (x, y) whose edges a beam touched,
+# the number of points each beam passed through and the targets hit as a bitmask
+Trace = namedtuple("Trace", ["hits", "segments", "cells", "steps", "mask"])
+
+
+class Puzzle:
+    '''
+    Immutable description of a puzzle, as read by parse_bff.
+
+    The board is compiled into a flat cell map over the laser coordinates,
+    padded by one point on every side, so the tracer moves a beam with index
+    arithmetic: point (x, y) is at index (y + 1) * stride + x + 1.
+
+    For every beam state the puzzle also stores where the next event is, so
+    the tracer jumps across empty space: jump[state] is the first point, from
+    the state's own point on, that is a target, sits on the edge of a cell
+    that can hold a block, or lies outside the board; dist[state] is the
+    number of steps to it.
+
+    Targets and open cells are numbered so that sets of them are integer
+    bitmasks: bit t of a hit mask is target_points[t], and bit i of a
+    placement bitset is the open cell at flat index open_index[i].
+
+    Parameters:
+        grid (list): 2D list of grid cells ('o', 'x', ...).
+        lasers (list): List of (x, y, vx, vy) tuples.
+        points (list): List of (x, y) target points.
+        blocks (dict): Dictionary of block types and their counts.
+    '''
+
+    def __init__(self, grid, lasers, points, blocks=None):
+        self.grid = tuple(tuple(row) for row in grid)
+        self.lasers = tuple(tuple(i) for i in lasers)
+        self.points = tuple(tuple(i) for i in points)
+        self.targets = frozenset(self.points)
+        self.blocks = dict(blocks or {})
+        self.cols = len(self.grid[0]) if self.grid else 0
+        self.rows = len(self.grid)
+        # Extent of the laser coordinates, edges included
+        self.width = self.cols * 2
+        self.height = self.rows * 2
+        self.stride = self.width + 3
+
+        size = self.stride * (self.height + 3)
+        cells = bytearray([OUTSIDE]) * size
+        edge = bytearray(size)
+        for y in range(self.height + 1):
+            for x in range(self.width + 1):
+                cells[self.index(x, y)] = EMPTY
+                # Points with an even x lie on a vertical block edge
+                edge[self.index(x, y)] = x % 2 == 0
+        for y, row in enumerate(self.grid):
+            for x, n in enumerate(row):
+                # Fixed blocks act as placed ones; unknown letters keep blocks out
+                cells[self.cell_index(x, y)] = CODES.get(n, BLOCKED)
+        self.cells = bytes(cells)
+        self.edge = bytes(edge)
+        # Distinct targets in order, and the number of the target at each point or -1
+        self.target_points = tuple(dict.fromkeys(self.points))
+        self.target_mask = (1 << len(self.target_points)) - 1
+        target_of = [-1] * size
+        for t, (x, y) in enumerate(self.target_points):
+            target_of[self.index(x, y)] = t
+        self.target_of = tuple(target_of)
+
+        self.open_index = tuple(self.cell_index(x, y) for x, y in self.open_cells())
+        self.open_bit = {c: 1 << i for i, c in enumerate(self.open_index)}
+        # Targets on the edges of each open cell
+        self.cell_targets = {}
+        for c in self.open_index:
+            around = (c - 1, c + 1, c - self.stride, c + self.stride)
+            self.cell_targets[c] = sum(1 << target_of[p] for p in around if target_of[p] >= 0)
+        # For each target, the open cells on both sides of it, when a beam can
+        # only reach it through them: filling them with reflect or opaque
+        # blocks seals the target off (refract blocks let the beam through)
+        starts = {(x, y) for x, y, vx, vy in self.lasers}
+        self.target_seals = {}
+        for t, (x, y) in enumerate(self.target_points):
+            p = self.index(x, y)
+            sides = (p - 1, p + 1) if edge[p] else (p - self.stride, p + self.stride)
+            if (x, y) not in starts and all(cells[i] in (OPEN, OUTSIDE) for i in sides):
+                self.target_seals[t] = sum(self.open_bit.get(i, 0) for i in sides)
+        self.step = tuple(vy * self.stride + vx for vx, vy in DIRECTIONS)
+        self.jump, self.dist = self._jump_tables()
+        # Built by moves() and static_layer() on first use
+        self._moves = None
+        self._static = None
+
+    def _jump_tables(self):
+        """Builds the jump and dist tables described in the class docstring"""
+        cells, edge, step, stride = self.cells, self.edge, self.step, self.stride
+        jump = [-1] * (len(cells) * 4)
+        dist = [0] * (len(cells) * 4)
+        for start in range(len(jump)):
+            # Walk the ray until an event or an already filled state
+            path = []
+            state = start
+            while jump[state] < 0:
+                p, d = divmod(state, 4)
+                if cells[p] == OUTSIDE or self.target_of[p] >= 0:
+                    break
+                ahead = p + (DIRECTIONS[d][0] if edge[p] else DIRECTIONS[d][1] * stride)
+                if cells[ahead] in (OPEN, REFLECT, OPAQUE, REFRACT):
+                    break
+                path.append(state)
+                state += step[d] * 4
+            if jump[state] < 0:
+                jump[state] = state // 4
+            # Fill the walked states back to front
+            for n, i in enumerate(reversed(path), 1):
+                jump[i] = jump[state]
+                dist[i] = dist[state] + n
+        return tuple(jump), tuple(dist)
+
+    def moves(self):
+        '''
+        Returns per event state tables of where a beam can go from there.
+
+        For an event state s (see jump): face[s] is the cell the beam is
+        heading into, or -1 outside the board; bit[s] is that cell's open
+        bit, or 0; go[s] and bounce[s] are the next event states when the
+        beam passes the cell or is reflected by it. start[i] is the first
+        event state of laser i. The tables are built on the first call.
+        '''
+        if self._moves is None:
+            n = len(self.cells) * 4
+            face, bit, go, bounce = [-1] * n, [0] * n, [0] * n, [0] * n
+            for s in range(n):
+                q, d = divmod(s, 4)
+                if self.cells[q] == OUTSIDE or self.jump[s] != q:
+                    continue
+                if self.edge[q]:
+                    c, r = q + (d >> 1) * 2 - 1, d ^ 2
+                else:
+                    c, r = q + ((d & 1) * 2 - 1) * self.stride, d ^ 1
+                face[s] = c
+                bit[s] = self.open_bit.get(c, 0)
+                go[s] = self.jump[(q + self.step[d]) * 4 + d] * 4 + d
+                bounce[s] = self.jump[q * 4 + r] * 4 + r
+            start = []
+            for x, y, vx, vy in self.lasers:
+                d = direction(vx, vy)
+                start.append(self.jump[self.index(x, y) * 4 + d] * 4 + d)
+            self._moves = (tuple(face), tuple(bit), tuple(go), tuple(bounce), tuple(start))
+        return self._moves
+
+    def static_layer(self):
+        '''
+        Returns the part of the laser field that no placement can change.
+
+        The lasers are followed through the fixed cells (empty, blocked and
+        fixed A, B and C blocks) up to the first event states that face an
+        open cell. Every placement traces the states passed on the way the
+        same, so they are traced once here: static is the set of them, mask
+        the targets they hit and frontier the event states facing an open
+        cell, in the order reached, where tracing a placement has to go on.
+        A beam of a placement that runs into a static state can stop, since
+        what follows it is static or on the frontier. The layer is built on
+        the first call.
+        '''
+        if self._static is None:
+            face, bit, go, bounce, start = self.moves()
+            static, frontier = set(), {}
+            mask = 0
+            stack = list(reversed(start))
+            while stack:
+                s = stack.pop()
+                if s in static or s in frontier:
+                    continue
+                c = face[s]
+                if bit[s]:
+                    frontier[s] = None
+                    continue
+                static.add(s)
+                t = self.target_of[s // 4]
+                if t >= 0:
+                    mask |= 1 << t
+                if c < 0:
+                    continue
+                code = self.cells[c]
+                if code == OPAQUE:
+                    continue
+                if code == REFLECT or code == REFRACT:
+                    stack.append(bounce[s])
+                if code != REFLECT:
+                    stack.append(go[s])
+            self._static = (tuple(frontier), frozenset(static), mask)
+        return self._static
+
+    @classmethod
+    def from_data(cls, data):
+        """Builds a Puzzle from the dictionary returned by parse_bff"""
+        return cls(data["grid"], data["lasers"], data["points"], data["blocks"])
+
+    def index(self, x, y):
+        """Returns the flat index of the point (x, y)"""
+        return (y + 1) * self.stride + x + 1
+
+    def cell_index(self, x, y):
+        """Returns the flat index of the centre of grid cell (x, y)"""
+        return self.index(2 * x + 1, 2 * y + 1)
+
+    def point(self, index):
+        """Returns the point (x, y) at a flat index"""
+        return index % self.stride - 1, index // self.stride - 1
+
+    def open_cells(self):
+        """Returns the cells (x, y) where a block may be placed"""
+        return [(x, y) for y, row in enumerate(self.grid) for x, n in enumerate(row) if n == 'o']
+
+
+def trace(puzzle, placement):
+    '''
+    Traces every laser of the puzzle through a block placement.
+
+    Parameters:
+        puzzle (Puzzle): The puzzle to trace.
+        placement (dict): Maps grid cells (x, y) to a block type 'A', 'B' or 'C'.
+    Returns:
+        Trace: See trace_cells.
+    '''
+    cells = bytearray(puzzle.cells)
+    for (x, y), block in placement.items():
+        cells[puzzle.cell_index(x, y)] = CODES[block]
+    return trace_cells(puzzle, cells)
+
+
+def check_placement(puzzle, placement):
+    '''
+    Checks if a placement is a solution of the puzzle: it uses exactly the
+    puzzle's blocks, only on open cells, and the lasers hit every target.
+
+    Parameters:
+        puzzle (Puzzle): The puzzle to check against.
+        placement (dict): Maps grid cells (x, y) to a block type 'A', 'B' or 'C'.
+    Returns:
+        bool: True if the placement solves the puzzle.
+    '''
+    counts = {}
+    for (x, y), block in placement.items():
+        if block not in ('A', 'B', 'C') or not (0 <= y < puzzle.rows and 0 <= x < puzzle.cols):
+            return False
+        if puzzle.grid[y][x] != 'o':
+            return False
+        counts[block] = counts.get(block, 0) + 1
+    if counts != {k: n for k, n in puzzle.blocks.items() if n}:
+        return False
+    cells = bytearray(puzzle.cells)
+    for (x, y), block in placement.items():
+        cells[puzzle.cell_index(x, y)] = CODES[block]
+    return trace_mask(puzzle, cells) == puzzle.target_mask
+
+
+def reach(puzzle, cells):
+    '''
+    Finds the open cells a beam could touch once the free ones are filled.
+
+    Every free open cell is taken to pass, reflect and stop the beam at
+    once, while placed and fixed blocks act as they do in trace_cells. So
+    whatever blocks are added to the free cells, the beams only ever touch
+    open cells in the mask returned, and the mask only depends on the
+    contents of the cells in it.
+
+    Parameters:
+        puzzle (Puzzle): The puzzle to trace.
+        cells (bytearray): A cell map as passed to trace_cells.
+    Returns:
+        int: Bitset of the open cells (see Puzzle.open_bit) a beam could touch.
+    '''
+    face, bit, go, bounce, _ = puzzle.moves()
+    # The static layer never faces an open cell, so start past it
+    frontier, static, _ = puzzle.static_layer()
+    seen = set()
+    mask = 0
+    stack = list(frontier)
+    while stack:
+        s = stack.pop()
+        if s in seen or s in static:
+            continue
+        seen.add(s)
+        c = face[s]
+        if c < 0:
+            continue
+        code = cells[c]
+        if code == EMPTY or code == BLOCKED or code == OUTSIDE:
+            stack.append(go[s])
+            continue
+        mask |= bit[s]
+        if code == OPAQUE:
+            continue
+        stack.append(bounce[s])
+        if code != REFLECT:
+            # Open cells may also stay empty, refract blocks split the beam
+            stack.append(go[s])
+    return mask
+
+
+def trace_mask(puzzle, cells):
+    '''
+    Finds the targets the lasers hit in a cell map, and nothing else.
+
+    The beams are followed over the event states of Puzzle.moves from the
+    static layer's frontier, so the fixed part of the field is not traced
+    again; no segments, cells or step counts are collected. The mask is the
+    one trace_cells returns for the same cell map.
+
+    Parameters:
+        puzzle (Puzzle): The puzzle to trace.
+        cells (bytearray): A cell map as passed to trace_cells.
+    Returns:
+        int: Bitmask of the targets hit (bit t is target_points[t]).
+    '''
+    face, _, go, bounce, _ = puzzle.moves()
+    frontier, static, mask = puzzle.static_layer()
+    target_of = puzzle.target_of
+    seen = set()
+    stack = list(frontier)
+    while stack:
+        s = stack.pop()
+        if s in seen or s in static:
+            continue
+        seen.add(s)
+        t = target_of[s >> 2]
+        if t >= 0:
+            mask |= 1 << t
+        c = face[s]
+        if c < 0:
+            continue
+        code = cells[c]
+        if code == OPAQUE:
+            continue
+        if code == REFLECT or code == REFRACT:
+            stack.append(bounce[s])
+        if code != REFLECT:
+            stack.append(go[s])
+    return mask
+
+
+def trace_cells(puzzle, cells):
+    '''
+    Traces every laser of the puzzle through a cell map.
+
+    Beams jump from event to event with the puzzle's jump tables. Each beam
+    state at an event is traced at most once: a beam ends when it leaves the
+    board, runs into an opaque block, or reaches an event state already
+    traced (it is looping, or has joined another beam). Refracted beams that
+    start from a traced state are dropped. Tracing therefore visits at most
+    4 * (width + 1) * (height + 1) states in total, whatever the placement.
+
+    Parameters:
+        puzzle (Puzzle): The puzzle to trace.
+        cells (bytearray): A copy of puzzle.cells with the placed blocks set.
+            It is only read.
+    Returns:
+        Trace: The targets hit, the beam segments, the block cells touched and
+        the number of points each beam passed through (lasers first, then
+        refracted beams in the order they were split off).
+    '''
+    stride = puzzle.stride
+    edge, jump, dist, step = puzzle.edge, puzzle.jump, puzzle.dist, puzzle.step
+    target_of = puzzle.target_of
+    mask = 0
+    segments = []
+    touched = set()
+    steps = []
+    # One flag per (point, direction) state
+    visited = bytearray(len(cells) * 4)
+
+    beams = [(puzzle.index(x, y), direction(vx, vy)) for x, y, vx, vy in puzzle.lasers]
+    for p, d in beams:
+        start = p
+        count = 1 + dist[p * 4 + d]
+        q = jump[p * 4 + d]
+        while True:
+            if cells[q] == OUTSIDE:
+                # The beam left the board, so its last point was one step back
+                count -= 1
+                q -= step[d]
+                break
+            state = q * 4 + d
+            if visited[state]:
+                break
+            visited[state] = 1
+            if target_of[q] >= 0:
+                mask |= 1 << target_of[q]
+
+            # The beam sits on a block edge; find the block it is heading into
+            if edge[q]:
+                c = q + (d >> 1) * 2 - 1
+                r = d ^ 2
+            else:
+                c = q + ((d & 1) * 2 - 1) * stride
+                r = d ^ 1
+            code = cells[c]
+            if OPEN <= code <= REFRACT:
+                touched.add(c)
+                if code == REFLECT:
+                    segments.append((start, q))
+                    start = q
+                    d = r
+                    count += dist[q * 4 + d]
+                    q = jump[q * 4 + d]
+                    continue
+                if code == OPAQUE:
+                    break
+                if code == REFRACT and not visited[q * 4 + r]:
+                    # Refraction: the reflected part becomes a new beam
+                    beams.append((q, r))
+
+            n = (q + step[d]) * 4 + d
+            count += 1 + dist[n]
+            q = jump[n]
+        segments.append((start, q))
+        steps.append(count)
+
+    point = puzzle.point
+    return Trace(
+        {p for t, p in enumerate(puzzle.target_points) if mask >> t & 1},
+        [(point(a), point(b)) for a, b in segments],
+        {(x // 2, y // 2) for x, y in map(point, touched)},
+        steps,
+        mask,
+    )
+
+
+class _Beam:
+    """A traced beam: the event states it owns, in order, and where it came from"""
+    __slots__ = ('states', 'parent', 'children', 'merged')
+
+    def __init__(self, parent):
+        self.states = []
+        self.parent = parent  # (beam id, index in its states) of the split, or None
+        self.children = []  # (index in states, beam id) of beams split off here
+        self.merged = None  # State this beam ran into, if it ended on a traced one
+
+
+class IncrementalTrace:
+    '''
+    Laser trace of a cell map that is kept up to date while cells change.
+
+    Every event state (see Puzzle) reached by a laser is owned by exactly one
+    beam. For each cell the trace keeps which beams query it, so changing a
+    cell only cuts those beams at the first state facing the cell, drops the
+    beams split off after that point, and traces them again from there.
+    Beams that had ended by running into a dropped state carry on in its
+    place. The targets hit and cells touched are updated in place, so the
+    cost of a change is proportional to the part of the beams it affects.
+
+    Parameters:
+        puzzle (Puzzle): The puzzle to trace.
+        cells (bytearray): Initial cell map; defaults to a copy of puzzle.cells.
+            The trace keeps and updates it as self.cells.
+    Attributes:
+        updates (int): Number of set_cell calls that changed a cell.
+        traced (int): Number of event states traced, over all updates.
+        splits (int): Number of beams started by refract blocks, over all updates.
+    '''
+
+    def __init__(self, puzzle, cells=None):
+        self.puzzle = puzzle
+        self.cells = bytearray(puzzle.cells) if cells is None else cells
+        self.beams = {}
+        self.owner = {}  # Event state -> id of the beam that owns it
+        self.waiting = {}  # Event state -> ids of beams that ended on it
+        self.queries = {}  # Cell index -> {beam id: number of states facing it}
+        self.hit_count = [0] * len(puzzle.target_points)
+        self.hit_mask = 0  # Targets with a non-zero hit count
+        self.touched_mask = 0  # Open cells with a beam facing them
+        self._next_id = 0
+        self.updates = 0
+        self.traced = 0
+        self.splits = 0
+        for x, y, vx, vy in puzzle.lasers:
+            p, d = puzzle.index(x, y), direction(vx, vy)
+            self._run(self._new_beam(None), puzzle.jump[p * 4 + d] * 4 + d)
+
+    def solved(self):
+        """Returns True if every target is hit"""
+        return self.hit_mask == self.puzzle.target_mask
+
+    def touches(self, index):
+        """Returns True if a beam touches the edge of the cell at a flat index"""
+        return index in self.queries
+
+    def hits(self):
+        """Returns the set of target points hit"""
+        return {p for t, p in enumerate(self.puzzle.target_points) if self.hit_mask >> t & 1}
+
+    def touched(self):
+        """Returns the cells (x, y) whose edges a beam touches"""
+        point = self.puzzle.point
+        return {(x // 2, y // 2) for x, y in map(point, self.queries)}
+
+    def set_cell(self, index, code):
+        """Sets the code of the cell at a flat index and retraces the beams facing it"""
+        if self.cells[index] == code:
+            return
+        self.cells[index] = code
+        self.updates += 1
+        # Beam id -> event state to trace it on from
+        resume = {}
+        for bid in list(self.queries.get(index, ())):
+            if bid not in self.beams:
+                continue
+            # Cut the beam at its first state facing the cell
+            beam = self.beams[bid]
+            k = next(k for k, state in enumerate(beam.states) if self._facing(state) == index)
+            state = beam.states[k]
+            for waiter, at in self._truncate(bid, k):
+                resume[waiter] = at
+            resume[bid] = state
+        for bid, state in resume.items():
+            if bid in self.beams:
+                self._run(bid, state)
+
+    def _new_beam(self, parent):
+        bid = self._next_id
+        self._next_id += 1
+        self.beams[bid] = _Beam(parent)
+        return bid
+
+    def _facing(self, state):
+        """Returns the flat index of the cell an event state faces"""
+        q, d = state >> 2, state & 3
+        if self.puzzle.edge[q]:
+            return q + (d >> 1) * 2 - 1
+        return q + ((d & 1) * 2 - 1) * self.puzzle.stride
+
+    def _run(self, bid, state):
+        """Traces beam bid on from event state, until it ends"""
+        puzzle, cells = self.puzzle, self.cells
+        jump, step, target_of = puzzle.jump, puzzle.step, puzzle.target_of
+        beam = self.beams[bid]
+        while True:
+            q, d = state >> 2, state & 3
+            if cells[q] == OUTSIDE:
+                return
+            if state in self.owner:
+                beam.merged = state
+                self.waiting.setdefault(state, []).append(bid)
+                return
+            self.owner[state] = bid
+            beam.states.append(state)
+            self.traced += 1
+            t = target_of[q]
+            if t >= 0:
+                self.hit_count[t] += 1
+                self.hit_mask |= 1 << t
+
+            c = self._facing(state)
+            code = cells[c]
+            if OPEN <= code <= REFRACT:
+                refs = self.queries.get(c)
+                if refs is None:
+                    refs = self.queries[c] = {}
+                    self.touched_mask |= self.puzzle.open_bit.get(c, 0)
+                refs[bid] = refs.get(bid, 0) + 1
+                r = d ^ 2 if puzzle.edge[q] else d ^ 1
+                if code == REFLECT:
+                    state = jump[q * 4 + r] * 4 + r
+                    continue
+                if code == OPAQUE:
+                    return
+                if code == REFRACT:
+                    child = self._new_beam((bid, len(beam.states) - 1))
+                    self.splits += 1
+                    beam.children.append((len(beam.states) - 1, child))
+                    self._run(child, jump[q * 4 + r] * 4 + r)
+            state = jump[(q + step[d]) * 4 + d] * 4 + d
+
+    def _truncate(self, bid, k):
+        '''
+        Drops the states of beam bid from index k on, and the beams split off
+        there. Returns (beam id, state) pairs for the beams that had ended on
+        a dropped state and must be traced on from it.
+        '''
+        beam = self.beams[bid]
+        dropped = beam.states[k:]
+        del beam.states[k:]
+        self._unmerge(bid)
+        woken = []
+        for i, child in [c for c in beam.children if c[0] >= k]:
+            woken.extend(self._drop_beam(child))
+        beam.children = [c for c in beam.children if c[0] < k]
+        woken.extend(self._release(bid, dropped))
+        return woken
+
+    def _drop_beam(self, bid):
+        """Removes beam bid and its split-off beams entirely"""
+        beam = self.beams.pop(bid)
+        self._unmerge(bid, beam)
+        woken = []
+        for i, child in beam.children:
+            woken.extend(self._drop_beam(child))
+        woken.extend(self._release(bid, beam.states))
+        return woken
+
+    def _unmerge(self, bid, beam=None):
+        beam = beam or self.beams[bid]
+        if beam.merged is not None:
+            self.waiting[beam.merged].remove(bid)
+            if not self.waiting[beam.merged]:
+                del self.waiting[beam.merged]
+            beam.merged = None
+
+    def _release(self, bid, states):
+        """Gives up ownership of states, undoing their hits and queries"""
+        woken = []
+        target_of = self.puzzle.target_of
+        for state in states:
+            del self.owner[state]
+            t = target_of[state >> 2]
+            if t >= 0:
+                self.hit_count[t] -= 1
+                if self.hit_count[t] == 0:
+                    self.hit_mask &= ~(1 << t)
+            c = self._facing(state)
+            refs = self.queries.get(c)
+            if refs is not None and bid in refs:
+                refs[bid] -= 1
+                if not refs[bid]:
+                    del refs[bid]
+                    if not refs:
+                        del self.queries[c]
+                        self.touched_mask &= ~self.puzzle.open_bit.get(c, 0)
+            for waiter in self.waiting.pop(state, ()):
+                self.beams[waiter].merged = None
+                woken.append((waiter, state))
+        return woken
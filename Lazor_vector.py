@@ -0,0 +1,158 @@
+'''
+EN.640.635 Software Carpentry at JHU
+Lazer Group Project
+Group： Weiting Yu, Yilin Li
+
+Lazor Game Solver - Batched Evaluation
+This script traces many candidate placements of a puzzle at once with NumPy.
+The beams of all candidates advance together, one event (see Puzzle.jump) per
+round, as arrays of beam states, so small puzzles can be solved by scoring the
+placements of the combinatorial enumerator in batches instead of one by one.
+
+NumPy is only needed by this module.
+
+
+'''
+
+from Lazor_trace import Puzzle, trace_cells, REFLECT, OPAQUE, REFRACT, OUTSIDE, CODES
+from Lazor_solver_finalversion import iter_placements
+import itertools
+import numpy as np
+
+
+def placement_array(puzzle, placements):
+    '''
+    Method placement_array.
+    Converts placements to the array evaluate takes.
+
+    Parameters:
+        puzzle (Puzzle): The puzzle the placements belong to.
+        placements (list): Placements as (position, block type) pairs, as
+            generated by iter_placements.
+    Returns:
+        ndarray: (N, open cells) uint8 array of cell codes, column i being
+        the open cell of bit i (see Puzzle.open_bit).
+    '''
+    column = {pos: i for i, pos in enumerate(puzzle.open_cells())}
+    array = np.ones((len(placements), len(column)), dtype=np.uint8)
+    for n, placement in enumerate(placements):
+        for pos, kind in placement:
+            array[n, column[pos]] = CODES[kind]
+    return array
+
+
+def evaluate(puzzle, placements, max_beams=None):
+    '''
+    Method evaluate.
+    Traces a batch of candidate placements and returns the targets each one hits.
+
+    The beams start from the puzzle's static layer (see
+    Puzzle.static_layer): the part of the field no placement changes is
+    traced once, not once per candidate. Every candidate has a buffer of
+    max_beams beam slots. In each round all
+    live beams move to their next event: they are stopped by an opaque block,
+    the board edge or a state their candidate already traced, and a refract
+    block starts a new beam in a free slot. A candidate whose buffer is full
+    when it has to start a beam is traced again with trace_cells, so the
+    result does not depend on max_beams.
+
+    Parameters:
+        puzzle (Puzzle): The puzzle to trace.
+        placements (ndarray): (N, open cells) array of cell codes, as built by
+            placement_array: OPEN (1) for an empty cell, REFLECT, OPAQUE or
+            REFRACT for a block.
+        max_beams (int): Beam slots per candidate; defaults to the number of
+            frontier states of the static layer plus two per refract block
+            to place.
+    Returns:
+        ndarray: N-length int64 array of target bitmasks, comparable with
+        puzzle.target_mask.
+    '''
+    if len(puzzle.target_points) > 63:
+        raise ValueError("evaluate supports at most 63 targets")
+    placements = np.asarray(placements, dtype=np.uint8)
+    n = len(placements)
+    frontier, static, static_mask = puzzle.static_layer()
+    if max_beams is None:
+        max_beams = len(frontier) + 2 * puzzle.blocks.get("C", 0)
+    max_beams = max(max_beams, len(frontier))
+    face, _, go, bounce, _ = (np.array(t, dtype=np.int64) for t in puzzle.moves())
+    target_bit = np.array([1 << t if t >= 0 else 0 for t in puzzle.target_of], dtype=np.int64)
+
+    # One cell map per candidate
+    cells = np.tile(np.frombuffer(puzzle.cells, dtype=np.uint8), (n, 1))
+    cells[:, list(puzzle.open_index)] = placements
+    visited = np.zeros((n, len(face)), dtype=bool)
+    visited[:, list(static)] = True
+    masks = np.full(n, static_mask, dtype=np.int64)
+    overflow = np.zeros(n, dtype=bool)
+
+    state = np.zeros((n, max_beams), dtype=np.int64)
+    alive = np.zeros((n, max_beams), dtype=bool)
+    state[:, :len(frontier)] = frontier
+    alive[:, :len(frontier)] = True
+
+    while alive.any():
+        r, b = np.nonzero(alive)
+        s = state[r, b]
+        # Beams on a state their candidate already traced, or that another
+        # beam reaches in the same round, are done
+        seen = visited[r, s]
+        _, first = np.unique(r * len(face) + s, return_index=True)
+        seen[np.setdiff1d(np.arange(len(s)), first)] = True
+        alive[r[seen], b[seen]] = False
+        r, b, s = r[~seen], b[~seen], s[~seen]
+        visited[r, s] = True
+        np.bitwise_or.at(masks, r, target_bit[s // 4])
+
+        # Code of the cell each beam heads into; beams leaving the board stop
+        c = face[s]
+        code = np.where(c < 0, OUTSIDE, cells[r, np.maximum(c, 0)])
+        stop = (c < 0) | (code == OPAQUE)
+        state[r, b] = np.where(code == REFLECT, bounce[s], go[s])
+        alive[r[stop], b[stop]] = False
+
+        # Refract blocks start a second beam in a free slot
+        for i in np.flatnonzero(code == REFRACT):
+            row, new = r[i], bounce[s[i]]
+            if visited[row, new]:
+                continue
+            free = np.flatnonzero(~alive[row])
+            if len(free) == 0:
+                overflow[row] = True
+                continue
+            state[row, free[0]] = new
+            alive[row, free[0]] = True
+
+    # Candidates that ran out of beam slots are traced one by one
+    for row in np.flatnonzero(overflow):
+        masks[row] = trace_cells(puzzle, bytearray(cells[row].tobytes())).mask
+    return masks
+
+
+def batch_solve(data, batch_size=4096, find_all=False):
+    '''
+    Method batch_solve.
+    Solves a puzzle by evaluating every placement of iter_placements in batches.
+
+    Parameters:
+        data (dict): Parsed puzzle, as returned by parse_bff.
+        batch_size (int): Number of placements evaluated at once.
+        find_all (bool): Whether to return every solution instead of the first.
+    Returns:
+        tuple or list: The first solution as (position, block type) pairs, or
+        None; with find_all, the list of all solutions.
+    '''
+    puzzle = Puzzle.from_data(data)
+    placements = iter_placements(puzzle.open_cells(), {k: n for k, n in data["blocks"].items() if n})
+    solutions = []
+    while True:
+        batch = list(itertools.islice(placements, batch_size))
+        if not batch:
+            break
+        hit = evaluate(puzzle, placement_array(puzzle, batch)) == puzzle.target_mask
+        for i in np.flatnonzero(hit):
+            if not find_all:
+                return batch[i]
+            solutions.append(batch[i])
+    return solutions if find_all else None
@@ -0,0 +1,159 @@
+'''
+EN.640.635 Software Carpentry at JHU
+Lazer Group Project
+Group： Weiting Yu, Yilin Li
+
+Lazor Game Solver - Bulk Placement Verifier
+This script checks submitted placements against a puzzle without solving it.
+Each placement is checked for its block counts and cells and traced once with
+the mask-only tracer, and the verdict lists what is wrong with it and which
+targets the lasers miss. Placements are read one JSON line each, as a list of
+[x, y, type] entries or as a record with a "placement" (and optional "id"),
+so the output of Lazor_batch and Lazor_server can be fed back in.
+
+    python Lazor_verify.py mad_1.bff submissions.jsonl > verdicts.jsonl
+
+
+'''
+
+from Lazor_parse import load_files
+from Lazor_trace import Puzzle, CODES, trace_mask
+import argparse
+import json
+import sys
+import time
+
+
+def _entries(placement):
+    """Returns the ((x, y), type) pairs of a dict or of a list of [x, y, type] or [[x, y], type] entries"""
+    if isinstance(placement, dict):
+        return list(placement.items())
+    entries = []
+    for entry in placement:
+        if len(entry) == 3:
+            x, y, kind = entry
+        else:
+            (x, y), kind = entry
+        entries.append(((x, y), kind))
+    return entries
+
+
+def verify_placement(puzzle, placement):
+    '''
+    Method verify_placement.
+    Checks a placement against a puzzle and says why it fails, if it does.
+
+    Parameters:
+        puzzle (Puzzle): The puzzle to check against.
+        placement (dict or list): Maps cells (x, y) to block types, or lists
+            [x, y, type] (or [[x, y], type]) entries.
+    Returns:
+        dict: valid (True if the placement solves the puzzle), errors (what
+        is wrong with the blocks: unknown types, cells that are not integer
+        pairs, not 'o' or used twice, wrong counts) and missed (the target
+        points the lasers do not hit, or None when the errors keep it from
+        being traced).
+    Raises:
+        ValueError: If the placement is not a list or dict of entries.
+    '''
+    try:
+        entries = _entries(placement)
+    except (TypeError, ValueError) as error:
+        raise ValueError(f"malformed placement: {error}")
+    errors = []
+    cells = bytearray(puzzle.cells)
+    counts = {}
+    used = set()
+    traceable = True
+    for (x, y), kind in entries:
+        if kind not in ('A', 'B', 'C'):
+            errors.append(f"unknown block type {kind!r} at ({x}, {y})")
+            traceable = False
+            continue
+        counts[kind] = counts.get(kind, 0) + 1
+        # bool is a subclass of int, but JSON true and false are no coordinates
+        if type(x) is not int or type(y) is not int:
+            errors.append(f"cell ({x!r}, {y!r}) is not a pair of integers")
+            traceable = False
+        elif not (0 <= y < puzzle.rows and 0 <= x < puzzle.cols):
+            errors.append(f"cell ({x}, {y}) is outside the grid")
+            traceable = False
+        elif (x, y) in used:
+            errors.append(f"cell ({x}, {y}) is used twice")
+            traceable = False
+        elif puzzle.grid[y][x] != 'o':
+            errors.append(f"cell ({x}, {y}) is {puzzle.grid[y][x]!r}, not 'o'")
+            traceable = False
+        else:
+            used.add((x, y))
+            cells[puzzle.cell_index(x, y)] = CODES[kind]
+    expected = {k: n for k, n in puzzle.blocks.items() if n}
+    for kind in sorted(set(counts) | set(expected)):
+        if counts.get(kind, 0) != expected.get(kind, 0):
+            errors.append(f"{counts.get(kind, 0)} {kind} blocks, the puzzle has {expected.get(kind, 0)}")
+
+    missed = None
+    if traceable:
+        mask = trace_mask(puzzle, cells)
+        missed = [list(p) for t, p in enumerate(puzzle.target_points) if not mask >> t & 1]
+    return {"valid": not errors and missed == [], "errors": errors, "missed": missed}
+
+
+def verify_lines(puzzle, lines):
+    '''
+    Method verify_lines.
+    Verifies a stream of JSON lines, one placement each.
+
+    Parameters:
+        puzzle (Puzzle): The puzzle to check against.
+        lines (iterable): JSON lines, each a placement as accepted by
+            verify_placement or a record with a "placement" and an optional
+            "id". Blank lines are skipped.
+    Yields:
+        dict: The verdict of verify_placement with the line number, the id
+        if the line had one, and an "error" entry for lines that could not
+        be read.
+    '''
+    for n, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        record = {"line": n}
+        try:
+            item = json.loads(line)
+            if isinstance(item, dict):
+                if "id" in item:
+                    record["id"] = item["id"]
+                item = item["placement"]
+            record.update(verify_placement(puzzle, item))
+        except (KeyError, TypeError, ValueError) as error:
+            record.update(valid=False, errors=[], missed=None, error=f"{type(error).__name__}: {error}")
+        yield record
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verify submitted placements of a Lazor puzzle.")
+    parser.add_argument("puzzle", help="the .bff file the placements are for")
+    parser.add_argument("placements", nargs="?", default="-", help="JSON lines file of placements (default: stdin)")
+    parser.add_argument("--failed-only", action="store_true", help="only write the verdicts of failed placements")
+    args = parser.parse_args()
+
+    puzzle = Puzzle.from_data(load_files([args.puzzle])[args.puzzle])
+    source = sys.stdin if args.placements == "-" else open(args.placements)
+    passed = failed = 0
+    start = time.perf_counter()
+    try:
+        for record in verify_lines(puzzle, source):
+            if record["valid"]:
+                passed += 1
+            else:
+                failed += 1
+            if not (args.failed_only and record["valid"]):
+                print(json.dumps(record))
+    finally:
+        if source is not sys.stdin:
+            source.close()
+    seconds = time.perf_counter() - start
+    rate = (passed + failed) / seconds if seconds else 0.0
+    print(f"{passed + failed} placements: {passed} passed, {failed} failed in {seconds:.3f} s "
+          f"({rate:.0f} per second)", file=sys.stderr)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,70 @@
+'''
+EN.640.635 Software Carpentry at JHU
+Lazer Group Project
+Group： Weiting Yu, Yilin Li
+
+Lazor Game Solver - Test Suite for the Library Entry Point
+This script contains test cases for Lazor_api.
+
+'''
+import importlib.util
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from Lazor_parse import load_files
+from Lazor_api import solve
+from Lazor_benchmark import measure_import
+from Lazor_solver_finalversion import SearchCancelled
+from Lazor_trace import Puzzle, check_placement
+
+HAVE_NUMPY = importlib.util.find_spec("numpy") is not None
+
+
+class TestSolve(unittest.TestCase):
+    '''
+    Test function solve.
+    '''
+    def setUp(self):
+        self.data = load_files(["mad_1.bff"])["mad_1.bff"]
+        self.puzzle = Puzzle.from_data(self.data)
+
+    def test_file_and_data(self):
+        self.assertEqual(dict(solve("mad_1.bff")), {(2, 0): 'C', (3, 1): 'A', (0, 2): 'A'})
+        self.assertEqual(solve(self.data), solve("mad_1.bff"))
+        self.assertTrue(check_placement(self.puzzle, dict(solve(self.data, engine="auto"))))
+        self.assertEqual(solve(self.data, engine="propagate"), solve(self.data))
+        with self.assertRaises(ValueError):
+            solve(self.data, engine="quantum")
+
+    def test_all_solutions(self):
+        self.data["points"] = [(3, 0)]
+        solutions = solve(self.data, find_all=True)
+        self.assertEqual(len(solutions), 165)
+        self.assertEqual(solve(self.data, limit=5), solutions[:5])
+        self.assertEqual(sorted(solve(self.data, engine="propagate", find_all=True)), sorted(solutions))
+        if HAVE_NUMPY:
+            self.assertEqual(sorted(solve(self.data, engine="batch", find_all=True)), sorted(solutions))
+
+    def test_budget_and_cache(self):
+        with self.assertRaises(SearchCancelled):
+            solve("mad_7.bff", nodes=64)
+        with self.assertRaises(ValueError):
+            solve(self.data, engine="batch", seconds=1)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "solutions.sqlite")
+            placement = solve(self.data, cache=path)
+            self.assertEqual(solve(self.data, cache=path, engine="parallel"), placement)
+
+    def test_import_is_light(self):
+        # Importing the entry point loads no engine and does no work
+        code = ("import sys, Lazor_api; "
+                "print(sorted(m for m in ('numpy', 'multiprocessing', 'sqlite3', 'logging') if m in sys.modules))")
+        run = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        self.assertEqual(run.stdout.strip(), "[]")
+        self.assertGreater(measure_import("Lazor_api", repeats=1), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
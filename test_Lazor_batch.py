@@ -0,0 +1,49 @@
+'''
+EN.640.635 Software Carpentry at JHU
+Lazer Group Project
+Group： Weiting Yu, Yilin Li
+
+Lazor Game Solver - Test Suite for the Batch Solver
+This script contains test cases for Lazor_batch and the file discovery in Lazor_parse.
+
+'''
+import os
+import unittest
+from Lazor_parse import find_bff_files
+from Lazor_batch import solve_file, solve_batch
+
+
+class TestBatch(unittest.TestCase):
+    '''
+    Test functions find_bff_files, solve_file and solve_batch.
+    '''
+    def test_find_bff_files(self):
+        found = find_bff_files(["Board", "mad_*.bff", "mad_1.bff", "missing.bff"])
+        self.assertIn(os.path.join("Board", "mad_5.bff"), found)
+        self.assertIn("mad_7.bff", found)
+        # Plain names are kept as given, each only once
+        self.assertEqual(found.count("mad_1.bff"), 1)
+        self.assertEqual(found[-1], "missing.bff")
+
+    def test_solve_file(self):
+        record = solve_file("mad_1.bff")
+        self.assertEqual(record["status"], "solved")
+        self.assertEqual(sorted(map(tuple, record["placement"])),
+                         [(0, 2, "A"), (2, 0, "C"), (3, 1, "A")])
+        self.assertGreater(record["nodes"], 0)
+
+    def test_timeout_and_error(self):
+        self.assertEqual(solve_file("mad_7.bff", timeout=1e-9)["status"], "timeout")
+        record = solve_file("missing.bff")
+        self.assertEqual(record["status"], "error")
+        self.assertIsNone(record["placement"])
+
+    def test_solve_batch(self):
+        files = ["mad_1.bff", "dark_1.bff", "missing.bff"]
+        records = list(solve_batch(files, workers=2, timeout=10))
+        self.assertEqual(sorted(r["file"] for r in records), sorted(files))
+        self.assertEqual({r["file"]: r["status"] for r in records}["dark_1.bff"], "solved")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+'''
+EN.640.635 Software Carpentry at JHU
+Lazer Group Project
+Group： Weiting Yu, Yilin Li
+
+Lazor Game Solver - Test Suite for the Benchmark Suite
+This script contains test cases for Lazor_benchmark, and checks the search
+counts of the Board/ levels against the stored baseline.
+
+'''
+import copy
+import json
+import unittest
+from Lazor_benchmark import run_level, run_suite, compare
+
+
+class TestBenchmark(unittest.TestCase):
+    '''
+    Test functions run_level and compare.
+    '''
+    def test_run_level(self):
+        result = run_level("mad_1.bff", repeats=2)
+        self.assertTrue(result["solved"])
+        self.assertLessEqual(result["seconds_min"], result["seconds"])
+        self.assertGreater(result["simulations"], 0)
+        self.assertGreater(result["laser_steps"], result["simulations"])
+        self.assertGreater(result["peak_kib"], 0)
+
+    def test_compare(self):
+        baseline = run_suite(["mad_1.bff"], repeats=1)
+        self.assertEqual(compare(baseline, baseline), [])
+
+        worse = copy.deepcopy(baseline)
+        worse["levels"]["mad_1.bff"]["nodes"] += 1
+        worse["levels"]["mad_1.bff"]["seconds"] *= 1.2
+        regressions = compare(worse, baseline)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn("nodes", regressions[0])
+        # A looser tolerance accepts the extra node
+        self.assertEqual(compare(worse, baseline, {"nodes": 0.1}), [])
+
+        worse["levels"]["mad_1.bff"]["solved"] = False
+        self.assertIn("mad_1.bff: no longer solved", compare(worse, baseline, {"nodes": 0.1}))
+
+    def test_search_counts_against_baseline(self):
+        with open("benchmark_baseline.json") as f:
+            baseline = json.load(f)
+        results = run_suite(list(baseline["levels"]), repeats=1)
+        # Times and memory depend on the machine; the search counts do not
+        counts = {"seconds": float("inf"), "peak_kib": float("inf")}
+        self.assertEqual(compare(results, baseline, counts), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+'''
+EN.640.635 Software Carpentry at JHU
+Lazer Group Project
+Group： Weiting Yu, Yilin Li
+
+Lazor Game Solver - Test Suite for the Solution Cache
+This script contains test cases for the sqlite cache in Lazor_cache.
+
+'''
+import copy
+import os
+import tempfile
+import unittest
+from Lazor_parse import load_files
+from Lazor_cache import SolutionCache, fingerprint, cached_solve
+from Lazor_trace import Puzzle, check_placement
+
+
+class TestSolutionCache(unittest.TestCase):
+    '''
+    Test class SolutionCache and function cached_solve.
+    '''
+    def setUp(self):
+        self.files = load_files(["mad_1.bff", "dark_1.bff", "tiny_5.bff"])
+        self.data = self.files["mad_1.bff"]
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "cache", "solutions.sqlite")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_fingerprint_is_canonical(self):
+        other = copy.deepcopy(self.data)
+        other["points"] = other["points"][::-1] + other["points"][:1]
+        other["blocks"] = {"C": 1, "B": 0, "A": 2}
+        self.assertEqual(fingerprint(other), fingerprint(self.data))
+        other["points"].pop()
+        other["points"].pop()
+        self.assertNotEqual(fingerprint(other), fingerprint(self.data))
+
+    def test_hit_and_miss(self):
+        cache = SolutionCache(self.path)
+        first = cached_solve(self.data, cache)
+        self.assertTrue(check_placement(Puzzle.from_data(self.data), dict(first)))
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+        cache.close()
+
+        # A new connection to the same file answers from disk
+        cache = SolutionCache(self.path)
+        self.assertEqual(cached_solve(self.data, cache), first)
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+        cache.close()
+
+    def test_stale_entry_is_dropped(self):
+        cache = SolutionCache(self.path)
+        cache.put(self.data, (((0, 0), "A"), ((1, 0), "A"), ((2, 0), "C")))
+        self.assertIsNone(cache.get(self.data))
+        self.assertEqual((cache.stale, len(cache)), (1, 0))
+        self.assertIsNotNone(cached_solve(self.data, cache))
+        self.assertEqual(len(cache), 1)
+        cache.close()
+
+    def test_lru_eviction(self):
+        cache = SolutionCache(self.path, max_entries=2)
+        mad_1, dark_1, tiny_5 = (self.files[name] for name in ("mad_1.bff", "dark_1.bff", "tiny_5.bff"))
+        cached_solve(mad_1, cache)
+        cached_solve(dark_1, cache)
+        # Using mad_1 again makes dark_1 the least recently used
+        cached_solve(mad_1, cache)
+        cached_solve(tiny_5, cache)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNotNone(cache.get(mad_1))
+        self.assertIsNone(cache.get(dark_1))
+        cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
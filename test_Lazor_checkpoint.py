@@ -0,0 +1,74 @@
+'''
+EN.640.635 Software Carpentry at JHU
+Lazer Group Project
+Group： Weiting Yu, Yilin Li
+
+Lazor Game Solver - Test Suite for Budgeted and Resumable Solving
+This script contains test cases for Lazor_checkpoint.
+
+'''
+import os
+import tempfile
+import threading
+import unittest
+from Lazor_parse import load_files
+from Lazor_checkpoint import resumable_solve, load_checkpoint
+from Lazor_solver_finalversion import iter_solutions, SearchStats
+from Lazor_trace import Puzzle, check_placement
+
+
+class TestResumableSolve(unittest.TestCase):
+    '''
+    Test function resumable_solve and the checkpoint files.
+    '''
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "solve.ckpt")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_resume_matches_uninterrupted_search(self):
+        data = load_files(["mad_1.bff"])["mad_1.bff"]
+        data["points"] = [(3, 0)]
+        full = SearchStats()
+        expected = list(iter_solutions(data, stats=full))
+
+        runs = 0
+        status = "stopped"
+        while status == "stopped":
+            status, solutions, stats = resumable_solve(data, self.path, nodes=64, find_all=True)
+            runs += 1
+        self.assertGreater(runs, 2)
+        self.assertEqual(status, "done")
+        self.assertEqual(solutions, expected)
+        self.assertEqual(vars(stats), vars(full))
+        # The checkpoint is gone once the search is over
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_cancel_and_resume_first_solution(self):
+        data = load_files(["mad_7.bff"])["mad_7.bff"]
+        token = threading.Event()
+        token.set()
+        status, solutions, stats = resumable_solve(data, self.path, cancel=token)
+        self.assertEqual((status, solutions), ("stopped", []))
+        frontier, saved, _, find_all = load_checkpoint(self.path, data)
+        self.assertFalse(find_all)
+        self.assertEqual(vars(saved), vars(stats))
+
+        status, solutions, _ = resumable_solve(data, self.path, seconds=0)
+        self.assertEqual(status, "stopped")
+        status, solutions, _ = resumable_solve(data, self.path)
+        self.assertEqual(status, "solved")
+        self.assertTrue(check_placement(Puzzle.from_data(data), dict(solutions[0])))
+
+    def test_rejects_other_puzzle(self):
+        data = load_files(["mad_7.bff"])["mad_7.bff"]
+        resumable_solve(data, self.path, nodes=64)
+        other = load_files(["mad_1.bff"])["mad_1.bff"]
+        with self.assertRaises(ValueError):
+            resumable_solve(other, self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
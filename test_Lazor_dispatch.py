@@ -0,0 +1,48 @@
+'''
+EN.640.635 Software Carpentry at JHU
+Lazer Group Project
+Group： Weiting Yu, Yilin Li
+
+Lazor Game Solver - Test Suite for the Estimator and Dispatcher
+This script contains test cases for Lazor_dispatch.
+
+'''
+import unittest
+from Lazor_parse import load_files
+from Lazor_dispatch import estimate, choose_engine, dispatch_solve, Estimate
+from Lazor_trace import Puzzle, check_placement
+
+
+class TestDispatch(unittest.TestCase):
+    '''
+    Test functions estimate, choose_engine and dispatch_solve.
+    '''
+    def setUp(self):
+        self.data = load_files(["mad_1.bff"])["mad_1.bff"]
+
+    def test_estimate(self):
+        est = estimate(self.data)
+        # 16 open cells, two A blocks and one C block: C(16, 2) * 14
+        self.assertEqual(est.placements, 1680)
+        self.assertGreaterEqual(est.tree_nodes, 1)
+        self.assertGreater(est.trace_length, 0)
+        self.assertEqual(estimate(self.data), est)
+
+    def test_choose_engine(self):
+        small = Estimate(placements=100, tree_nodes=1000, trace_length=10)
+        self.assertEqual(choose_engine(small, 4, have_numpy=True)[0], "batch")
+        self.assertEqual(choose_engine(small, 4, have_numpy=False)[0], "dfs")
+        large = Estimate(placements=10 ** 12, tree_nodes=10 ** 7, trace_length=10)
+        self.assertEqual(choose_engine(large, 4, have_numpy=True)[0], "parallel")
+        self.assertEqual(choose_engine(large, 1, have_numpy=True)[0], "dfs")
+
+    def test_dispatch_solve_logs_decision(self):
+        with self.assertLogs("Lazor_dispatch", level="INFO") as logs:
+            engine, result = dispatch_solve(self.data, workers=1, name="mad_1")
+        self.assertIn(engine, ("batch", "dfs"))
+        self.assertIn("mad_1", logs.output[0])
+        self.assertTrue(check_placement(Puzzle.from_data(self.data), dict(result)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+'''
+EN.640.635 Software Carpentry at JHU
+Lazer Group Project
+Group： Weiting Yu, Yilin Li
+
+Lazor Game Solver - Test Suite for the Puzzle Generator
+This script contains test cases for Lazor_generate.
+
+'''
+import os
+import tempfile
+import unittest
+from Lazor_parse import parse_bff, load_files
+from Lazor_generate import generate, to_bff, write_puzzle
+from Lazor_solver_finalversion import setup, make_blocks, dfs_solve
+from Lazor_trace import Puzzle, check_placement, trace
+
+
+class TestGenerate(unittest.TestCase):
+    '''
+    Test functions generate, to_bff and write_puzzle.
+    '''
+    def test_planted_solution(self):
+        for seed in range(10):
+            data, solution = generate(6, 5, blocked=0.2, blocks={"A": 3, "B": 1, "C": 1},
+                                      lasers=2, targets=4, seed=seed)
+            puzzle = Puzzle.from_data(data)
+            self.assertTrue(check_placement(puzzle, dict(solution)))
+            self.assertEqual((len(data["grid"]), len(data["grid"][0])), (5, 6))
+            self.assertEqual(sum(row.count("x") for row in data["grid"]), 6)
+            self.assertEqual((len(data["lasers"]), len(puzzle.target_points)), (2, 4))
+            # The blocks are needed: an empty board misses a target
+            self.assertNotEqual(trace(puzzle, {}).mask, puzzle.target_mask)
+        self.assertEqual(generate(6, 5, seed=3), generate(6, 5, seed=3))
+
+    def test_bff_round_trip(self):
+        data, solution = generate(5, 5, blocks={"A": 2, "C": 1}, seed=1)
+        self.assertEqual(parse_bff(to_bff(data, "a comment")), data)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "gen.bff")
+            write_puzzle(path, data, solution, seed=1)
+            loaded = load_files([path])[path]
+        self.assertEqual(loaded, data)
+        board = setup(loaded)
+        self.assertIsNotNone(dfs_solve(board, make_blocks(loaded["blocks"]), board.puzzle.open_cells()))
+
+    def test_impossible_requests(self):
+        with self.assertRaises(ValueError):
+            generate(2, 2, blocked=0.5, blocks={"A": 3})
+        with self.assertRaises(ValueError):
+            generate(2, 2, blocks={"A": 1}, targets=50, attempts=5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+'''
+EN.640.635 Software Carpentry at JHU
+Lazer Group Project
+Group： Weiting Yu, Yilin Li
+
+Lazor Game Solver - Test Suite for the Instrumentation
+This script contains test cases for Lazor_instrument.
+
+'''
+import os
+import tempfile
+import unittest
+from Lazor_parse import load_files
+from Lazor_instrument import Instrumentation, instrumented_solve, profile_solve, sample_solve, write_collapsed
+from Lazor_solver_finalversion import setup, make_blocks, dfs_solve, SearchStats, SearchCancelled
+
+
+class TestInstrumentation(unittest.TestCase):
+    '''
+    Test class Instrumentation and the profiling functions.
+    '''
+    def setUp(self):
+        self.data = load_files(["mad_7.bff"])["mad_7.bff"]
+
+    def test_counters_match_plain_search(self):
+        board = setup(self.data)
+        # The beams traced when the board is built are not part of the search
+        initial = board.tracer.traced
+        stats = SearchStats()
+        dfs_solve(board, make_blocks(self.data["blocks"]), board.puzzle.open_cells(), stats)
+
+        snapshots = []
+        solved, snapshot = instrumented_solve(self.data, [snapshots.append], interval=0)
+        self.assertIsNotNone(solved)
+        self.assertEqual(snapshot["nodes"], stats.nodes)
+        self.assertEqual(snapshot["traces"], board.tracer.updates)
+        self.assertEqual(snapshot["beam_steps"], board.tracer.traced - initial)
+        self.assertGreater(snapshot["timers"]["trace"], 0)
+        self.assertLessEqual(snapshot["timers"]["trace"], snapshot["elapsed"])
+        # A snapshot every 64 nodes, and a last one at the end
+        self.assertEqual(len(snapshots), stats.nodes // 64 + 1)
+        self.assertEqual(snapshots[-1]["nodes"], stats.nodes)
+        # The board's own methods are back once the search is over
+        self.assertNotIn("place_block", vars(solved))
+
+    def test_simulate_and_cancel(self):
+        class Stop:
+            def is_set(self):
+                return True
+
+        board = setup(self.data)
+        instrument = Instrumentation(cancel=Stop())
+        with self.assertRaises(SearchCancelled):
+            dfs_solve(board, make_blocks(self.data["blocks"]), board.puzzle.open_cells(), instrument=instrument)
+
+        instrument.attach(board, SearchStats())
+        result = board.simulate()
+        instrument.detach()
+        snapshot = instrument.snapshot()
+        self.assertEqual(snapshot["simulations"], 1)
+        self.assertEqual(snapshot["beam_steps"], sum(result.steps))
+
+    def test_profiles(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "solve.prof")
+            stats = profile_solve(self.data, path)
+            self.assertTrue(os.path.exists(path))
+            self.assertGreater(stats.total_calls, 0)
+
+            samples = sample_solve(self.data, interval=0.0001)
+            self.assertTrue(any("_dfs_place" in stack for stack in samples))
+            path = os.path.join(tmp, "solve.folded")
+            write_collapsed(samples, path)
+            with open(path) as f:
+                self.assertEqual(sum(int(line.rsplit(" ", 1)[1]) for line in f), sum(samples.values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
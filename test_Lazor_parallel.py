@@ -0,0 +1,51 @@
+'''
+EN.640.635 Software Carpentry at JHU
+Lazer Group Project
+Group： Weiting Yu, Yilin Li
+
+Lazor Game Solver - Test Suite for the Parallel Search
+This script contains test cases for the process pool search in Lazor_parallel.
+
+'''
+import unittest
+from Lazor_parse import load_files
+from Lazor_parallel import parallel_solve, split
+from Lazor_solver_finalversion import setup, iter_placements, SearchStats
+from Lazor_trace import trace
+
+
+class TestParallelSolve(unittest.TestCase):
+    '''
+    Test function parallel_solve.
+    '''
+    def setUp(self):
+        self.data = load_files(["mad_1.bff"])["mad_1.bff"]
+
+    def test_first_solution(self):
+        result = parallel_solve(self.data, workers=2)
+        self.assertEqual(dict(result), {(2, 0): 'C', (3, 1): 'A', (0, 2): 'A'})
+
+    def test_enumerate_all_matches_brute_force(self):
+        # A single target leaves many solutions
+        self.data["points"] = [(3, 0)]
+        puzzle = setup(self.data).puzzle
+        expected = {frozenset(p) for p in iter_placements(puzzle.open_cells(), self.data["blocks"])
+                    if trace(puzzle, dict(p)).mask == puzzle.target_mask}
+        self.assertGreater(len(expected), 1)
+
+        for depth in (1, 2, 3):
+            result = parallel_solve(self.data, workers=2, split_depth=depth, find_all=True)
+            self.assertEqual(len(result), len(expected))
+            self.assertEqual({frozenset(p) for p in result}, expected)
+
+    def test_split_covers_tree(self):
+        stats = SearchStats()
+        subproblems, solutions = split(self.data, 1, stats)
+        self.assertEqual(solutions, [])
+        # One subproblem per first block: every type on every touched cell
+        self.assertEqual(len(subproblems), stats.nodes - 1)
+        self.assertTrue(all(bin(sum(s.state)).count("1") == 1 for s in subproblems))
+
+
+if __name__ == "__main__":
+    unittest.main()
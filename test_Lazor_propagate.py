@@ -0,0 +1,53 @@
+'''
+EN.640.635 Software Carpentry at JHU
+Lazer Group Project
+Group： Weiting Yu, Yilin Li
+
+Lazor Game Solver - Test Suite for the Constraint Propagation Engine
+This script contains test cases for Lazor_propagate, checked against the DFS.
+
+'''
+import glob
+import unittest
+from Lazor_parse import load_files
+from Lazor_propagate import propagate_solve, PropagationStats
+from Lazor_solver_finalversion import iter_solutions
+from Lazor_trace import Puzzle, check_placement
+
+
+class TestPropagate(unittest.TestCase):
+    '''
+    Test function propagate_solve.
+    '''
+    def test_board_levels(self):
+        for file_name in sorted(glob.glob("Board/*.bff")):
+            data = load_files([file_name])[file_name]
+            stats = PropagationStats()
+            placement = propagate_solve(data, stats=stats)
+            self.assertTrue(check_placement(Puzzle.from_data(data), dict(placement)), file_name)
+            self.assertGreater(stats.nodes, 0)
+
+    def test_all_solutions_match_dfs(self):
+        data = load_files(["mad_1.bff"])["mad_1.bff"]
+        data["points"] = [(3, 0)]
+        solutions = propagate_solve(data, find_all=True)
+        self.assertEqual(len(solutions), 165)
+        self.assertEqual(sorted(solutions), sorted(iter_solutions(data)))
+
+        # Fixed blocks in front of the laser of mad_1
+        data["grid"] = [row.split() for row in ("o o o o", "o o A x", "o C o o", "C C B x")]
+        data["points"] = [(3, 0), (4, 3)]
+        self.assertEqual(sorted(propagate_solve(data, find_all=True)), sorted(iter_solutions(data)))
+
+    def test_no_solution(self):
+        data = load_files(["mad_1.bff"])["mad_1.bff"]
+        # With one reflect block fewer no placement hits every target
+        data["blocks"] = {"A": 1, "C": 1}
+        stats = PropagationStats()
+        self.assertIsNone(propagate_solve(data, stats=stats))
+        self.assertEqual(propagate_solve(data, find_all=True), [])
+        self.assertGreater(stats.failures, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+'''
+EN.640.635 Software Carpentry at JHU
+Lazer Group Project
+Group： Weiting Yu, Yilin Li
+
+Lazor Game Solver - Test Suite for the Solve Server
+This script contains test cases for Lazor_server, run against a server on a
+free localhost port.
+
+'''
+import json
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from Lazor_parse import load_files
+from Lazor_server import SolveService, serve
+from Lazor_trace import Puzzle, check_placement
+
+
+class TestSolveServer(unittest.TestCase):
+    '''
+    Test the /solve and /stats endpoints and the queue limit.
+    '''
+    @classmethod
+    def setUpClass(cls):
+        cls.service = SolveService(workers=1, max_queue=4)
+        cls.service.start()
+        cls.server = serve(cls.service, port=0)
+        cls.url = "http://127.0.0.1:%d" % cls.server.server_address[1]
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.service.close()
+
+    def post(self, body):
+        """POSTs a body to /solve and returns the status code and decoded answer"""
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode("utf-8")
+        try:
+            with urllib.request.urlopen(self.url + "/solve", body) as response:
+                return response.status, json.load(response)
+        except urllib.error.HTTPError as error:
+            return error.code, json.load(error)
+
+    def test_solve(self):
+        with open("mad_1.bff", "rb") as f:
+            code, record = self.post(f.read())
+        self.assertEqual(code, 200)
+        self.assertEqual(record["status"], "solved")
+        data = load_files(["mad_1.bff"])["mad_1.bff"]
+        placement = {(x, y): kind for x, y, kind in record["placement"]}
+        self.assertTrue(check_placement(Puzzle.from_data(data), placement))
+
+        code, record = self.post({"puzzle": data, "limit": 2})
+        self.assertEqual((code, len(record["solutions"])), (200, 1))
+
+    def test_deadline_and_bad_requests(self):
+        data = load_files(["mad_7.bff"])["mad_7.bff"]
+        code, record = self.post({"puzzle": data, "deadline": 0})
+        self.assertEqual((code, record["status"]), (200, "timeout"))
+        self.assertEqual(self.post({"puzzle": {"grid": []}})[0], 400)
+        self.assertEqual(self.post(b"not a puzzle")[0], 400)
+
+        with open("mad_1.bff") as f:
+            bff = f.read()
+        bad = [{"bff": bff.replace("L 2 7 1 -1", "P 1")},
+               {"bff": bff, "deadline": "soon"},
+               {"bff": bff, "deadline": -1},
+               {"bff": bff, "limit": "2"},
+               {"bff": bff, "engine": "quantum"},
+               {"bff": bff, "engine": "propagate", "deadline": 5}]
+        for request in bad:
+            with self.subTest(request={k: v for k, v in request.items() if k != "bff"}):
+                code, record = self.post(request)
+                self.assertEqual((code, record["status"]), (400, "bad_request"))
+        self.assertEqual(self.post(bff.replace("L 2 7 1 -1", "P 1").encode("utf-8"))[0], 400)
+
+    def test_default_deadline_skips_other_engines(self):
+        with open("mad_1.bff") as f:
+            bff = f.read()
+        self.service.deadline = 30
+        try:
+            code, record = self.post({"bff": bff, "engine": "propagate"})
+        finally:
+            self.service.deadline = None
+        self.assertEqual((code, record["status"]), (200, "solved"))
+
+    def test_queue_full_and_stats(self):
+        with open("mad_1.bff") as f:
+            bff = f.read()
+        self.service.max_queue = 0
+        try:
+            code, record = self.post({"bff": bff})
+        finally:
+            self.service.max_queue = 4
+        self.assertEqual((code, record["status"]), (503, "rejected"))
+
+        self.post({"bff": bff})
+        with urllib.request.urlopen(self.url + "/stats") as response:
+            stats = json.load(response)
+        self.assertGreaterEqual(stats["rejected"], 1)
+        self.assertGreaterEqual(stats["solved"], 1)
+        self.assertEqual(stats["queued"], 0)
+        self.assertLessEqual(stats["latency_ms"]["p50"], stats["latency_ms"]["max"])
+
+
+if __name__ == "__main__":
+    unittest.main()
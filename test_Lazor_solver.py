@@ -0,0 +1,124 @@
+'''
+EN.640.635 Software Carpentry at JHU
+Lazer Group Project
+Group： Weiting Yu, Yilin Li
+
+Lazor Game Solver - Test Suite for the Solver
+This script contains test cases for the DFS search in Lazor_solver_finalversion.
+
+'''
+import os
+import tempfile
+import unittest
+from Lazor_parse import load_files
+from Lazor_solver_finalversion import (setup, dfs_solve, count_placements, iter_placements, search, make_blocks,
+                                       iter_solutions, save_solution_to_txt, SearchStats, TranspositionTable)
+from Lazor_Board import ReflectBlock, OpaqueBlock, RefractBlock
+from Lazor_trace import Puzzle, trace
+
+
+class TestDFSSolve(unittest.TestCase):
+    '''
+    Test function dfs_solve.
+    '''
+    def test_iter_placements_match_closed_form(self):
+        positions = [(x, y) for y in range(3) for x in range(3)]
+        blocks = {"A": 2, "B": 1, "C": 1}
+        placements = list(iter_placements(positions, blocks))
+        self.assertEqual(len(placements), count_placements(9, blocks))
+        self.assertEqual(len(placements), 1512)
+        self.assertEqual(len(set(frozenset(i) for i in placements)), 1512)
+
+    def test_exhausted_search_undoes_placements(self):
+        # A corner point is never on a beam, so the whole tree is explored
+        data = load_files(["mad_1.bff"])["mad_1.bff"]
+        data["points"] = [(0, 0)]
+        board = setup(data)
+        positions = [(x, y) for y in range(4) for x in range(4)]
+        blocks = [ReflectBlock((0, 0)), ReflectBlock((0, 0)), OpaqueBlock((0, 0))]
+
+        stats = SearchStats()
+        self.assertIsNone(dfs_solve(board, blocks, positions, stats))
+        self.assertGreater(stats.pruned, 0)
+        self.assertLess(stats.leaves, count_placements(16, {"A": 2, "B": 1}))
+        # Every placement was undone on the way out of the search
+        self.assertEqual(board.blocks, {})
+        self.assertEqual(bytes(board.cells), board.puzzle.cells)
+
+    def test_solves_mad_1(self):
+        data = load_files(["mad_1.bff"])["mad_1.bff"]
+        board = setup(data)
+        positions = [(x, y) for y in range(4) for x in range(4)]
+        blocks = [ReflectBlock((0, 0)), ReflectBlock((0, 0)), RefractBlock((0, 0))]
+
+        solution = dfs_solve(board, blocks, positions)
+        self.assertIsNotNone(solution)
+        self.assertEqual(solution.placement(), {(2, 0): 'C', (3, 1): 'A', (0, 2): 'A'})
+
+    def test_save_solution_to_txt(self):
+        data = load_files(["mad_1.bff"])["mad_1.bff"]
+        blocks = [ReflectBlock((0, 0)), ReflectBlock((0, 0)), RefractBlock((0, 0))]
+        solution = dfs_solve(setup(data), blocks, [(x, y) for y in range(4) for x in range(4)])
+        with tempfile.TemporaryDirectory() as directory:
+            save_solution_to_txt(solution, os.path.join(directory, "mad_1.bff"))
+            with open(os.path.join(directory, "mad_1_solution.txt")) as f:
+                rows = [line.split(" ") for line in f.read().split("\n")]
+        self.assertEqual(len(rows), len(solution.grid))
+        # Blocks are written as their type letters, at the doubled coordinates
+        for (x, y), kind in solution.placement().items():
+            self.assertEqual(rows[y * 2][x * 2], kind)
+        self.assertEqual(sum(row.count('o') for row in rows), 13)
+
+    def test_iter_solutions(self):
+        data = load_files(["mad_1.bff"])["mad_1.bff"]
+        data["points"] = [(3, 0)]
+        puzzle = Puzzle.from_data(data)
+        expected = {frozenset(p) for p in iter_placements(puzzle.open_cells(), data["blocks"])
+                    if trace(puzzle, dict(p)).mask == puzzle.target_mask}
+        solutions = list(iter_solutions(data))
+        self.assertEqual(len(solutions), len(set(solutions)))
+        self.assertEqual({frozenset(p) for p in solutions}, expected)
+
+        stats = SearchStats()
+        self.assertEqual(list(iter_solutions(data, limit=3, stats=stats)), solutions[:3])
+        # Only the part of the tree leading to the first three was searched
+        full = SearchStats()
+        list(iter_solutions(data, stats=full))
+        self.assertLess(stats.nodes, full.nodes)
+        self.assertEqual(list(iter_solutions(data, limit=0)), [])
+
+    def test_count_placements(self):
+        self.assertEqual(count_placements(24, {"A": 6}), 134596)
+        self.assertEqual(count_placements(3, {"A": 2, "B": 2}), 0)
+
+
+class TestTranspositionTable(unittest.TestCase):
+    '''
+    Test class TranspositionTable.
+    '''
+    def test_lru_eviction(self):
+        table = TranspositionTable(max_entries=2)
+        table.add(1)
+        table.add(2)
+        self.assertIn(1, table)
+        table.add(3)
+        # 2 was the least recently used key
+        self.assertNotIn(2, table)
+        self.assertEqual((len(table), table.evictions, table.hits), (2, 1, 1))
+
+    def test_skips_equivalent_subtrees(self):
+        # An extra target no beam can reach makes numbered_6 unsolvable
+        data = load_files(["numbered_6.bff"])["numbered_6.bff"]
+        data["points"].append((0, 1))
+        board = setup(data)
+        plain = SearchStats()
+        self.assertIsNone(next(search(board, make_blocks(data["blocks"]), board.puzzle.open_cells(), plain), None))
+
+        stats = SearchStats()
+        self.assertIsNone(dfs_solve(board, make_blocks(data["blocks"]), board.puzzle.open_cells(), stats))
+        self.assertGreater(stats.transpositions, 0)
+        self.assertLess(stats.nodes, plain.nodes)
+
+
+if __name__ == "__main__":
+    unittest.main()
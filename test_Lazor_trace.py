@@ -0,0 +1,192 @@
+'''
+EN.640.635 Software Carpentry at JHU
+Lazer Group Project
+Group： Weiting Yu, Yilin Li
+
+Lazor Game Solver - Test Suite for Laser Tracing
+This script contains test cases for the tracer in Lazor_trace.
+
+'''
+import random
+import unittest
+from Lazor_parse import load_files
+from Lazor_trace import (Puzzle, IncrementalTrace, CODES, OPEN, OUTSIDE, direction, trace, trace_mask,
+                         check_placement, reach)
+from Lazor_Board import ReflectBlock, RefractBlock
+from Lazor_solver_finalversion import setup
+
+# Known solution of mad_1: C at (2, 0), A at (3, 1) and (0, 2)
+mad_1_solution = {(2, 0): 'C', (3, 1): 'A', (0, 2): 'A'}
+
+
+class TestTrace(unittest.TestCase):
+    '''
+    Test function trace.
+    '''
+    def setUp(self):
+        self.puzzle = Puzzle.from_data(load_files(["mad_1.bff"])["mad_1.bff"])
+
+    def test_solution_hits_all_points(self):
+        result = trace(self.puzzle, mad_1_solution)
+        self.assertEqual(result.hits, set(self.puzzle.points))
+        self.assertIn((2, 0), result.cells)
+
+    def test_check_placement(self):
+        self.assertTrue(check_placement(self.puzzle, mad_1_solution))
+        # Wrong block counts, or a block off the open cells, never pass
+        self.assertFalse(check_placement(self.puzzle, {**mad_1_solution, (0, 0): 'B'}))
+        self.assertFalse(check_placement(self.puzzle, {(2, 0): 'C', (3, 1): 'A', (4, 2): 'A'}))
+        self.assertFalse(check_placement(self.puzzle, {(2, 0): 'C', (3, 1): 'A', (0, 3): 'A'}))
+
+    def test_bitmasks(self):
+        puzzle = self.puzzle
+        self.assertEqual(trace(puzzle, mad_1_solution).mask, puzzle.target_mask)
+        self.assertEqual(puzzle.target_mask, 0b1111)
+        # Open cells are numbered in row order; (2, 0) is the third one
+        self.assertEqual(puzzle.open_bit[puzzle.cell_index(2, 0)], 1 << 2)
+        # Target (3, 0) lies on the top edge of cell (1, 0), the only way in
+        self.assertEqual(puzzle.cell_targets[puzzle.cell_index(1, 0)], 1 << 0)
+        self.assertEqual(puzzle.target_seals[0], 1 << 1)
+
+    def test_trace_is_repeatable(self):
+        placement = dict(mad_1_solution)
+        first = trace(self.puzzle, placement)
+        second = trace(self.puzzle, placement)
+        self.assertEqual(first, second)
+        self.assertEqual(placement, mad_1_solution)
+        self.assertEqual(self.puzzle.lasers, ((2, 7, 1, -1),))
+
+    def test_opaque_block_stops_laser(self):
+        # The laser starts heading into cell (1, 3)
+        result = trace(self.puzzle, {(1, 3): 'B'})
+        self.assertEqual(result.hits, set())
+        self.assertEqual(result.segments, [((2, 7), (2, 7))])
+        self.assertEqual(result.steps, [1])
+
+    def test_trapped_beam_terminates(self):
+        # Reflect blocks on both sides of the starting edge bounce the beam in place
+        puzzle = Puzzle([["o", "o"], ["o", "o"]], [(2, 1, 1, 1)], [(0, 1)])
+        result = trace(puzzle, {(0, 0): 'A', (1, 0): 'A'})
+        self.assertEqual(result.cells, {(0, 0), (1, 0)})
+        self.assertEqual(result.hits, set())
+        # Two reflections at the same point, then the first state repeats
+        self.assertEqual(result.steps, [1])
+
+    def test_jump_tables(self):
+        puzzle = self.puzzle
+        # From the laser start the next event is the start itself: it faces open cell (1, 3)
+        start = puzzle.index(2, 7) * 4 + direction(1, -1)
+        self.assertEqual((puzzle.jump[start], puzzle.dist[start]), (puzzle.index(2, 7), 0))
+        # Every state on the board reaches an event or the edge
+        for state, q in enumerate(puzzle.jump):
+            if puzzle.cells[state // 4] != OUTSIDE:
+                self.assertNotEqual(q, -1)
+
+    def test_steps_count_points(self):
+        # Straight across a 2x2 board of 'x' cells, with no events on the way
+        puzzle = Puzzle([["x", "x"], ["x", "x"]], [(0, 3, 1, -1)], [(3, 0)])
+        result = trace(puzzle, {})
+        self.assertEqual(result.hits, {(3, 0)})
+        self.assertEqual(result.segments, [((0, 3), (3, 0))])
+        self.assertEqual(result.steps, [4])
+
+    def test_board_simulate_is_bounded(self):
+        board = setup(load_files(["mad_1.bff"])["mad_1.bff"])
+        # A refract block between two reflect blocks traps the split beam
+        for position, block in (((1, 3), RefractBlock((0, 0))), ((0, 3), ReflectBlock((0, 0))),
+                                ((1, 2), ReflectBlock((0, 0)))):
+            board.place_block(block, position)
+        result = board.simulate()
+        self.assertEqual(board.steps, result.steps)
+        self.assertLessEqual(sum(result.steps), 4 * 9 * 9)
+        self.assertFalse(board.check())
+
+        self.assertEqual(board.state(), (1 << 12 | 1 << 9, 0, 1 << 13))
+
+        board.remove_block((1, 3))
+        board.remove_block((0, 3))
+        board.remove_block((1, 2))
+        self.assertEqual(bytes(board.cells), board.puzzle.cells)
+
+    def test_reach_covers_completions(self):
+        rng = random.Random(1)
+        puzzle = self.puzzle
+        cells = puzzle.open_cells()
+        for _ in range(50):
+            placement = {cell: rng.choice("ABC") for cell in rng.sample(cells, 3)}
+            partial = bytearray(puzzle.cells)
+            for cell, block in placement.items():
+                partial[puzzle.cell_index(*cell)] = CODES[block]
+            mask = reach(puzzle, partial)
+            # Whatever is added on the free cells, beams stay within the mask
+            free = [cell for cell in cells if cell not in placement]
+            for _ in range(10):
+                full = dict(placement)
+                full.update({cell: rng.choice("ABC") for cell in rng.sample(free, 3)})
+                for cell in trace(puzzle, full).cells:
+                    self.assertTrue(mask & puzzle.open_bit[puzzle.cell_index(*cell)])
+
+    def test_static_layer(self):
+        # Fixed blocks in front of the laser of mad_1
+        grid = [row.split() for row in ("o o o o", "o o A x", "o C o o", "C C B x")]
+        puzzle = Puzzle(grid, self.puzzle.lasers, self.puzzle.points)
+        frontier, static, mask = puzzle.static_layer()
+        face, bit = puzzle.moves()[:2]
+        self.assertEqual(len(static), 5)
+        self.assertTrue(all(bit[s] for s in frontier))
+        self.assertFalse(any(bit[s] for s in static))
+        # The static targets are hit whatever is placed on the open cells
+        rng = random.Random(2)
+        cells = puzzle.open_cells()
+        for _ in range(50):
+            placement = {cell: rng.choice("ABC") for cell in rng.sample(cells, rng.randint(0, 5))}
+            self.assertEqual(trace(puzzle, placement).mask & mask, mask)
+
+    def test_trace_mask(self):
+        rng = random.Random(3)
+        grid = [row.split() for row in ("o o o o", "o o A x", "o C o o", "C C B x")]
+        for puzzle in (self.puzzle, Puzzle(grid, self.puzzle.lasers, self.puzzle.points)):
+            cells = puzzle.open_cells()
+            for _ in range(100):
+                placement = {cell: rng.choice("ABC") for cell in rng.sample(cells, rng.randint(0, len(cells)))}
+                full = bytearray(puzzle.cells)
+                for cell, block in placement.items():
+                    full[puzzle.cell_index(*cell)] = CODES[block]
+                self.assertEqual(trace_mask(puzzle, full), trace(puzzle, placement).mask)
+
+
+class TestIncrementalTrace(unittest.TestCase):
+    '''
+    Test class IncrementalTrace against a full trace after every change.
+    '''
+    def test_matches_full_trace(self):
+        rng = random.Random(0)
+        for _ in range(100):
+            grid = [[rng.choice("ooox") for _ in range(4)] for _ in range(3)]
+            # Points with exactly one odd coordinate: lasers and targets
+            spots = [(x, y) for x in range(9) for y in range(7) if (x + y) % 2]
+            lasers = [rng.choice(spots) + (rng.choice((-1, 1)), rng.choice((-1, 1))) for _ in range(2)]
+            puzzle = Puzzle(grid, lasers, rng.sample(spots, 3))
+            incremental = IncrementalTrace(puzzle)
+            placement = {}
+            for _ in range(20):
+                cell = rng.choice(puzzle.open_cells() or [(0, 0)])
+                if cell in placement:
+                    del placement[cell]
+                    code = OPEN
+                else:
+                    placement[cell] = rng.choice("ABC")
+                    code = CODES[placement[cell]]
+                incremental.set_cell(puzzle.cell_index(*cell), code)
+
+                full = trace(puzzle, placement)
+                self.assertEqual(incremental.hits(), full.hits)
+                self.assertEqual(incremental.touched(), full.cells)
+                self.assertEqual(incremental.solved(), full.hits == puzzle.targets)
+                self.assertEqual(incremental.hit_mask, full.mask)
+                touched = sum(puzzle.open_bit.get(puzzle.cell_index(*i), 0) for i in full.cells)
+                self.assertEqual(incremental.touched_mask, touched)
+
+
+if __name__ == "__main__":
+    unittest.main()
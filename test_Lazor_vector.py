@@ -0,0 +1,72 @@
+'''
+EN.640.635 Software Carpentry at JHU
+Lazer Group Project
+Group： Weiting Yu, Yilin Li
+
+Lazor Game Solver - Test Suite for the Batched Evaluation
+This script contains test cases for the NumPy engine in Lazor_vector. They are
+skipped when NumPy is not installed.
+
+'''
+import importlib.util
+import itertools
+import random
+import unittest
+from Lazor_parse import load_files
+from Lazor_solver_finalversion import iter_placements
+from Lazor_trace import Puzzle, trace
+
+HAVE_NUMPY = importlib.util.find_spec("numpy") is not None
+if HAVE_NUMPY:
+    from Lazor_vector import placement_array, evaluate, batch_solve
+
+
+@unittest.skipUnless(HAVE_NUMPY, "NumPy is not installed")
+class TestEvaluate(unittest.TestCase):
+    '''
+    Test functions evaluate and batch_solve.
+    '''
+    def setUp(self):
+        self.data = load_files(["mad_1.bff"])["mad_1.bff"]
+        self.puzzle = Puzzle.from_data(self.data)
+
+    def test_matches_trace(self):
+        rng = random.Random(0)
+        cells = self.puzzle.open_cells()
+        placements = [tuple((cell, rng.choice("ABC")) for cell in rng.sample(cells, rng.randint(0, 8)))
+                      for _ in range(300)]
+        expected = [trace(self.puzzle, dict(p)).mask for p in placements]
+        array = placement_array(self.puzzle, placements)
+        # A single beam slot forces refract splits back to trace_cells
+        for max_beams in (None, 1):
+            self.assertEqual(list(evaluate(self.puzzle, array, max_beams)), expected)
+
+    def test_fixed_blocks(self):
+        # Part of the field is traced once, in the puzzle's static layer
+        self.data["grid"] = [row.split() for row in ("o o o o", "o o A x", "o C o o", "C C B x")]
+        puzzle = Puzzle.from_data(self.data)
+        self.assertTrue(puzzle.static_layer()[1])
+        rng = random.Random(1)
+        cells = puzzle.open_cells()
+        placements = [tuple((cell, rng.choice("ABC")) for cell in rng.sample(cells, rng.randint(0, 6)))
+                      for _ in range(200)]
+        expected = [trace(puzzle, dict(p)).mask for p in placements]
+        self.assertEqual(list(evaluate(puzzle, placement_array(puzzle, placements))), expected)
+
+    def test_leaf_batches(self):
+        placements = list(itertools.islice(iter_placements(self.puzzle.open_cells(), self.data["blocks"]), 500))
+        masks = evaluate(self.puzzle, placement_array(self.puzzle, placements))
+        self.assertEqual(masks.shape, (500,))
+
+    def test_batch_solve(self):
+        result = batch_solve(self.data, batch_size=100)
+        self.assertEqual(dict(result), {(2, 0): 'C', (3, 1): 'A', (0, 2): 'A'})
+        self.data["points"] = [(3, 0)]
+        puzzle = Puzzle.from_data(self.data)
+        expected = [p for p in iter_placements(puzzle.open_cells(), self.data["blocks"])
+                    if trace(puzzle, dict(p)).mask == puzzle.target_mask]
+        self.assertEqual(batch_solve(self.data, batch_size=100, find_all=True), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+'''
+EN.640.635 Software Carpentry at JHU
+Lazer Group Project
+Group： Weiting Yu, Yilin Li
+
+Lazor Game Solver - Test Suite for the Placement Verifier
+This script contains test cases for Lazor_verify.
+
+'''
+import json
+import random
+import unittest
+from Lazor_parse import load_files
+from Lazor_verify import verify_placement, verify_lines
+from Lazor_trace import Puzzle, check_placement, trace
+
+# Known solution of mad_1: C at (2, 0), A at (3, 1) and (0, 2)
+mad_1_solution = {(2, 0): 'C', (3, 1): 'A', (0, 2): 'A'}
+
+
+class TestVerify(unittest.TestCase):
+    '''
+    Test functions verify_placement and verify_lines.
+    '''
+    def setUp(self):
+        self.puzzle = Puzzle.from_data(load_files(["mad_1.bff"])["mad_1.bff"])
+
+    def test_verify_placement(self):
+        record = verify_placement(self.puzzle, mad_1_solution)
+        self.assertEqual(record, {"valid": True, "errors": [], "missed": []})
+        listed = [[x, y, kind] for (x, y), kind in mad_1_solution.items()]
+        self.assertEqual(verify_placement(self.puzzle, listed), record)
+
+        placement = {(2, 0): 'C', (3, 1): 'A', (1, 1): 'A'}
+        record = verify_placement(self.puzzle, placement)
+        self.assertEqual((record["valid"], record["errors"]), (False, []))
+        hits = trace(self.puzzle, placement).hits
+        self.assertEqual(record["missed"], [list(p) for p in self.puzzle.target_points if p not in hits])
+
+        record = verify_placement(self.puzzle, [[2, 0, 'C'], [2, 0, 'A'], [9, 9, 'A'], [1, 1, 'D']])
+        self.assertFalse(record["valid"])
+        self.assertIsNone(record["missed"])
+        self.assertEqual(len(record["errors"]), 3)
+        with self.assertRaises(ValueError):
+            verify_placement(self.puzzle, 5)
+
+        # JSON true must not pass for the coordinate 1
+        record = verify_placement(self.puzzle, json.loads('[[true, 0, "A"], [3, 1, "A"], [2, 0, "C"]]'))
+        self.assertEqual((record["valid"], record["missed"]), (False, None))
+        self.assertEqual(record["errors"], ["cell (True, 0) is not a pair of integers"])
+
+    def test_agrees_with_check_placement(self):
+        rng = random.Random(0)
+        cells = self.puzzle.open_cells()
+        placements = [mad_1_solution, {**mad_1_solution, (0, 0): 'B'}]
+        placements += [{cell: rng.choice("AAC") for cell in rng.sample(cells, 3)} for _ in range(200)]
+        for placement in placements:
+            self.assertEqual(verify_placement(self.puzzle, placement)["valid"],
+                             check_placement(self.puzzle, placement))
+
+    def test_verify_lines(self):
+        lines = [json.dumps({"id": "a", "placement": [[x, y, k] for (x, y), k in mad_1_solution.items()]}),
+                 "",
+                 json.dumps([[2, 0, 'C']]),
+                 "not json",
+                 json.dumps({"id": "b"})]
+        records = list(verify_lines(self.puzzle, lines))
+        self.assertEqual([r["line"] for r in records], [1, 3, 4, 5])
+        self.assertEqual([r["valid"] for r in records], [True, False, False, False])
+        self.assertEqual((records[0]["id"], records[3]["id"]), ("a", "b"))
+        self.assertIn("error", records[2])
+        self.assertNotIn("error", records[1])
+
+
+if __name__ == "__main__":
+    unittest.main()